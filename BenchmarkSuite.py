@@ -0,0 +1,475 @@
+# Benchmark runner for the hot paths of the standalone systems in this folder.
+#
+#   python BenchmarkSuite.py                      run every workload, print ops/s
+#   python BenchmarkSuite.py --list               list workload names
+#   python BenchmarkSuite.py --only url,parking   run workloads whose name starts with a prefix
+#   python BenchmarkSuite.py --scale 0.1          shrink (or grow) every workload
+#   python BenchmarkSuite.py --repeat 5           keep the best of N runs
+#   python BenchmarkSuite.py --instrument         add call counters and latency histograms
+#   python BenchmarkSuite.py --json run.json      save results
+#   python BenchmarkSuite.py --compare base.json [--threshold 0.1]
+#                                                 exit 1 if any workload is >10% slower
+
+from collections import deque
+from contextlib import redirect_stdout
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# -------------------- MODULE LOADING --------------------
+_modules = {}
+
+def load(filename):
+    """Import a sibling script by file name (several contain spaces).
+
+    Scripts that run their demo at import time (Phonebook.py) are silenced.
+    """
+    module = _modules.get(filename)
+    if module is None:
+        name = os.path.splitext(filename)[0].replace(" ", "_")
+        spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+        module = importlib.util.module_from_spec(spec)
+        with redirect_stdout(io.StringIO()):
+            spec.loader.exec_module(module)
+        _modules[filename] = module
+    return module
+
+
+# -------------------- INSTRUMENTATION --------------------
+class LatencyHistogram:
+    """Power-of-two latency buckets: recording is one bit_length and an add.
+
+    Bucket k holds samples in [2**(k-1), 2**k) ns, so percentiles are
+    reported as the bucket's upper bound (within 2x of the true value).
+    """
+
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+
+    def record(self, ns):
+        self.buckets[ns.bit_length()] += 1
+        self.count += 1
+        self.total_ns += ns
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(p * self.count))
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return 1 << k
+        return 1 << 63
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ns": round(self.total_ns / self.count, 1) if self.count else 0,
+            "p50_ns": self.percentile(0.50),
+            "p90_ns": self.percentile(0.90),
+            "p99_ns": self.percentile(0.99),
+            "max_ns": self.percentile(1.0),
+        }
+
+
+class Instrumentation:
+    """Counters and latency histograms around hot-path methods.
+
+    Disabled by default: wrap() then hands back the original callable, so an
+    uninstrumented run pays nothing. When enabled each call costs two
+    perf_counter_ns() reads and a histogram update.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def wrap(self, name, fn, count_misses=True):
+        # count_misses: also count calls returning a falsy result
+        # (request blocked, code unknown, no spot / point free, ...)
+        if not self.enabled:
+            return fn
+        histogram = self.histograms.setdefault(name, LatencyHistogram())
+        counters = self.counters
+        clock = time.perf_counter_ns
+        miss_key = name + ".misses"
+        if count_misses:
+            counters.setdefault(miss_key, 0)
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = fn(*args, **kwargs)
+            histogram.record(clock() - start)
+            if count_misses and not result:
+                counters[miss_key] += 1
+            return result
+        return timed
+
+    def instrument(self, obj, method, name=None, count_misses=True):
+        """Replace obj.method on the instance, so internal callers are timed too."""
+        wrapped = self.wrap(name or method, getattr(obj, method), count_misses)
+        if wrapped is not getattr(obj, method):
+            setattr(obj, method, wrapped)
+        return getattr(obj, method)
+
+    def snapshot(self):
+        counters = dict(self.counters)
+        for name, histogram in self.histograms.items():
+            counters[name + ".calls"] = histogram.count
+        return {
+            "counters": dict(sorted(counters.items())),
+            "latency": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+        }
+
+
+# -------------------- WORKLOADS --------------------
+# Each workload builds its state outside the timed region and returns
+# (run, ops): run() executes the hot loop, ops is the number of operations.
+
+def _keys(rng, population, count, prefix):
+    # Skewed key popularity: a few hot keys, a long tail
+    weights = [1.0 / (i + 1) for i in range(population)]
+    names = [f"{prefix}{i}" for i in range(population)]
+    return rng.choices(names, weights, k=count)
+
+def _words(rng, count, alphabet="abcdefghijklmnop", min_len=4, max_len=10):
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(min_len, max_len)))
+            for _ in range(count)]
+
+def _prefixes(rng, words, count, min_len=2, max_len=4):
+    return [rng.choice(words)[:rng.randint(min_len, max_len)] for _ in range(count)]
+
+
+def workload_rate_limiter_token_bucket(scale, rng, instr):
+    module = load("RateLimiter.py")
+    ops = int(500_000 * scale)
+    keys = _keys(rng, max(1, int(10_000 * scale)), ops, "user")
+    limiter = module.TokenBucketRateLimiter(capacity=20, refill_rate=5)
+    allow = instr.instrument(limiter, "allow_request", "rate_limiter.allow_request")
+
+    def run():
+        for key in keys:
+            allow(key)
+    return run, ops
+
+
+def workload_rate_limiter_fixed_window(scale, rng, instr):
+    module = load("RateLimiter.py")
+    ops = int(500_000 * scale)
+    keys = _keys(rng, max(1, int(10_000 * scale)), ops, "user")
+    limiter = module.FixedWindowRateLimiter(limit=20, window_size=10)
+    allow = instr.instrument(limiter, "allow_request", "rate_limiter.allow_request")
+
+    def run():
+        for key in keys:
+            allow(key)
+    return run, ops
+
+
+def workload_url_shorten(scale, rng, instr):
+    module = load("URlshortner.py")
+    ops = int(200_000 * scale)
+    unique = [f"https://example.com/{i}/{rng.getrandbits(32):08x}" for i in range(int(ops * 0.8))]
+    urls = unique + rng.choices(unique, k=ops - len(unique))   # 20% repeats
+    rng.shuffle(urls)
+    service = module.UrlShortenerService(module.EncoderFactory.get_encoder(module.EncoderType.BASE62))
+    shorten = instr.instrument(service, "shorten_url", "url.shorten_url")
+
+    def run():
+        for url in urls:
+            shorten(url)
+    return run, ops
+
+
+def workload_url_expand(scale, rng, instr):
+    module = load("URlshortner.py")
+    ops = int(500_000 * scale)
+    service = module.UrlShortenerService(module.EncoderFactory.get_encoder(module.EncoderType.BASE62))
+    codes = [service.shorten_url(f"https://example.com/{i}") for i in range(max(1, int(100_000 * scale)))]
+    lookups = rng.choices(codes, k=ops - ops // 20) + ["zzzzzzz"] * (ops // 20)   # 5% unknown
+    rng.shuffle(lookups)
+    expand = instr.instrument(service, "expand_url", "url.expand_url")
+
+    def run():
+        for code in lookups:
+            expand(code)
+    return run, ops
+
+
+def workload_search_suggestions(scale, rng, instr):
+    module = load("SearchSystem.py")
+    ops = int(20_000 * scale)
+    trie = module.Trie()
+    words = _words(rng, max(1, int(50_000 * scale)))
+    for word in words:
+        trie.insert_word(word)
+    queries = _prefixes(rng, words, ops)
+    suggest = instr.instrument(trie, "top_suggested_words", "search.top_suggested_words")
+
+    def run():
+        for prefix in queries:
+            suggest(prefix)
+    return run, ops
+
+
+def workload_phonebook_suggestions(scale, rng, instr):
+    module = load("Phonebook.py")
+    ops = int(20_000 * scale)
+    names = [w.capitalize() for w in _words(rng, max(1, int(20_000 * scale)))]
+    trie = module.Trie()
+    for i, name in enumerate(names):
+        trie.insert_contact(module.Contact(name, 9_000_000_000 + i))
+    queries = [p.capitalize() for p in _prefixes(rng, names, ops)]
+    suggest = instr.instrument(trie, "contact_suggestions", "phonebook.contact_suggestions")
+
+    def run():
+        for prefix in queries:
+            suggest(prefix)
+    return run, ops
+
+
+def _parking_lot(module, total_spots, floors=10):
+    sizes = (module.SpotSize.SMALL, module.SpotSize.MEDIUM, module.SpotSize.LARGE)
+    per_floor = total_spots // floors
+    return module.ParkingLot([
+        module.ParkingFloor(f, [module.ParkingSpot(i, sizes[i * 3 // per_floor]) for i in range(per_floor)])
+        for f in range(floors)
+    ], verbose=False)
+
+
+def workload_parking_fill(scale, rng, instr):
+    module = load("ParkingLot.py")
+    total = max(30, int(50_000 * scale))
+    lot = _parking_lot(module, total)
+    types = (module.VehicleType.MOTORCYCLE, module.VehicleType.CAR, module.VehicleType.CAR, module.VehicleType.BUS)
+    vehicles = [module.Vehicle(f"V{i}", rng.choice(types)) for i in range(total)]
+    park = instr.instrument(lot, "park_vehicle", "parking.park_vehicle")
+
+    def run():
+        for vehicle in vehicles:
+            park(vehicle)
+    return run, len(vehicles)
+
+
+def workload_parking_churn(scale, rng, instr):
+    # Rush hour on a ~95% full lot: each operation is one exit plus one arrival
+    module = load("ParkingLot.py")
+    total = max(30, int(50_000 * scale))
+    ops = int(100_000 * scale)
+    lot = _parking_lot(module, total)
+    types = (module.VehicleType.MOTORCYCLE, module.VehicleType.CAR, module.VehicleType.CAR)
+    tickets = []
+    for i in range(int(total * 0.95)):
+        ticket = lot.park_vehicle(module.Vehicle(f"V{i}", types[i % 3]))
+        if ticket:
+            tickets.append(ticket.ticket_id)
+    rng.shuffle(tickets)
+    tickets = deque(tickets)
+    arrivals = [module.Vehicle(f"R{i}", rng.choice(types)) for i in range(ops)]
+    park = instr.instrument(lot, "park_vehicle", "parking.park_vehicle")
+
+    def run():
+        for vehicle in arrivals:
+            if tickets:
+                lot.exit_vehicle(tickets.popleft())
+            ticket = park(vehicle)
+            if ticket:
+                tickets.append(ticket.ticket_id)
+    return run, ops
+
+
+def workload_ev_allocate(scale, rng, instr):
+    module = load("EVChargeing System.py")
+    ops = int(500_000 * scale)
+    types = list(module.ChargingType)
+    area = module.ChargingArea()
+    levels = 40
+    points_per_level = max(1, int(100 * scale))
+    for i in range(levels):
+        area.add_level(module.ChargingLevel(points_per_level, types[i % len(types)]))
+    capacity = levels * points_per_level
+    requests = [(types[rng.randrange(len(types))], rng.random()) for _ in range(ops)]
+    allocate = instr.instrument(area, "allocate_point", "ev.allocate_point")
+
+    def run():
+        in_use = []
+        for charge_type, coin in requests:
+            if in_use and (coin < 0.5 or len(in_use) > capacity * 0.9):
+                # swap-remove a random in-use point
+                index = int(coin * len(in_use)) % len(in_use)
+                in_use[index], in_use[-1] = in_use[-1], in_use[index]
+                area.release_point(in_use.pop())
+            else:
+                point = allocate(charge_type)
+                if point:
+                    in_use.append(point)
+    return run, ops
+
+
+def workload_notification_notify(scale, rng, instr):
+    module = load("NotificationSystem.py")
+    ops = int(200_000 * scale)
+    service = module.NotificationService()
+    channels = [module.StubChannel() for _ in range(3)]
+    for channel in channels:
+        service.attach(channel)
+    notifications = [module.Notification(f"user{rng.randrange(10_000)}", f"Order {i} shipped")
+                     for i in range(ops)]
+    notify = instr.instrument(service, "notify", "notification.notify", count_misses=False)
+
+    def run():
+        for notification in notifications:
+            notify(notification)
+        instr.count("notification.delivered", sum(c.delivered for c in channels))
+    return run, ops
+
+
+WORKLOADS = {
+    "rate_limiter.token_bucket": workload_rate_limiter_token_bucket,
+    "rate_limiter.fixed_window": workload_rate_limiter_fixed_window,
+    "url.shorten": workload_url_shorten,
+    "url.expand": workload_url_expand,
+    "search.top_suggested_words": workload_search_suggestions,
+    "phonebook.contact_suggestions": workload_phonebook_suggestions,
+    "parking.fill": workload_parking_fill,
+    "parking.churn": workload_parking_churn,
+    "ev.allocate_point": workload_ev_allocate,
+    "notification.notify": workload_notification_notify,
+}
+
+
+# -------------------- RUNNER --------------------
+def run_workload(name, scale=1.0, repeat=3, seed=50, instrument=False):
+    """Best-of-repeat timing; each repeat rebuilds state from the same seed."""
+    best = None
+    for _ in range(repeat):
+        instr = Instrumentation(enabled=instrument)
+        run, ops = WORKLOADS[name](scale, random.Random(seed), instr)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, ops, instr)
+    elapsed, ops, instr = best
+    result = {
+        "ops": ops,
+        "seconds": round(elapsed, 6),
+        "ops_per_sec": round(ops / elapsed, 1) if elapsed else 0.0,
+        "repeat": repeat,
+    }
+    if instrument:
+        result.update(instr.snapshot())
+    return result
+
+
+def run_suite(names=None, scale=1.0, repeat=3, seed=50, instrument=False, verbose=True):
+    names = names or list(WORKLOADS)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "repeat": repeat,
+            "seed": seed,
+            "instrumented": instrument,
+        },
+        "results": {},
+    }
+    for name in names:
+        result = run_workload(name, scale, repeat, seed, instrument)
+        report["results"][name] = result
+        if verbose:
+            line = f"{name:32s} {result['ops_per_sec']:>14,.0f} ops/s  ({result['ops']:,} ops in {result['seconds']:.3f}s)"
+            latency = result.get("latency", {})
+            for probe, stats in latency.items():
+                line += f"\n{'':32s} {probe}: p50 {stats['p50_ns']:,} ns, p99 {stats['p99_ns']:,} ns"
+            print(line)
+    return report
+
+
+def compare(report, baseline, threshold=0.10, verbose=True):
+    """Return workload names that got slower than baseline by more than threshold."""
+    if report["meta"].get("instrumented") != baseline["meta"].get("instrumented"):
+        print("warning: comparing instrumented and uninstrumented runs")
+    if report["meta"].get("scale") != baseline["meta"].get("scale"):
+        print("warning: runs used different --scale values")
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base["ops_per_sec"]:
+            continue
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        status = "ok"
+        if change < -threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif change > threshold:
+            status = "faster"
+        if verbose:
+            print(f"{name:32s} {base['ops_per_sec']:>14,.0f} -> {result['ops_per_sec']:>14,.0f} ops/s "
+                  f"{change:+7.1%}  {status}")
+    return regressions
+
+
+def _option(flag, default=None):
+    if flag in sys.argv:
+        index = sys.argv.index(flag) + 1
+        if index < len(sys.argv) and not sys.argv[index].startswith("--"):
+            return sys.argv[index]
+    return default
+
+
+if __name__ == "__main__":
+    if "--list" in sys.argv:
+        print("\n".join(WORKLOADS))
+        sys.exit()
+
+    only = _option("--only")
+    names = list(WORKLOADS)
+    if only:
+        prefixes = only.split(",")
+        names = [n for n in names if any(n.startswith(p) for p in prefixes)]
+        if not names:
+            raise ValueError(f"No workload matches {only!r}")
+
+    report = run_suite(
+        names,
+        scale=float(_option("--scale", 1.0)),
+        repeat=int(_option("--repeat", 3)),
+        seed=int(_option("--seed", 50)),
+        instrument="--instrument" in sys.argv,
+    )
+
+    json_path = _option("--json")
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {json_path}")
+
+    baseline_path = _option("--compare")
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline_path}:")
+        regressions = compare(report, baseline, float(_option("--threshold", 0.10)))
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
\ No newline at end of file
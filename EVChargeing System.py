@@ -12,9 +12,22 @@
 
 
 from abc import ABC, abstractmethod
+from array import array
 from enum import Enum
+import asyncio
+import heapq
+import json
+import math
+import mmap
+import os
+import random
 import time
 
+try:
+    import numpy as np
+except ImportError:   # BatchPricer falls back to pure Python
+    np = None
+
 # ---------------- ENUMS ----------------
 
 class ChargingType(Enum):
@@ -30,79 +43,141 @@ class Status(Enum):
 # ---------------- VEHICLE ----------------
 
 class Veichle:
-    def __init__(self, curr_charge, charge_type: ChargingType):
+    def __init__(self, curr_charge, charge_type: ChargingType, battery_kwh=60.0):
         self.curr_charge = curr_charge
         self.charge_type = charge_type
+        self.battery_kwh = battery_kwh
+
+# ---------------- TARIFFS ----------------
+
+class Tariff:
+    def __init__(self, step_percent, unit_price, hourly_multipliers=None):
+        # One unit buys step_percent of charge; hourly_multipliers is a
+        # 24-entry time-of-use table indexed by the session start hour.
+        self.step_percent = step_percent
+        self.unit_price = unit_price
+        self.hourly_multipliers = hourly_multipliers or [1.0] * 24
+
+    def units(self, curr_charge):
+        # Same count as stepping curr_charge up by step_percent until it
+        # reaches 100, computed with one floor division
+        return max(0, -((curr_charge - 100) // self.step_percent))
+
+    def price(self, curr_charge, start_hour=None):
+        cost = self.units(curr_charge) * self.unit_price
+        if start_hour is not None and self.hourly_multipliers[start_hour % 24] != 1:
+            cost *= self.hourly_multipliers[start_hour % 24]
+        return cost
+
+
+TARIFFS = {
+    ChargingType.Level1AC: Tariff(5, 5),
+    ChargingType.Level2AC: Tariff(10, 10),
+    ChargingType.DCFast: Tariff(20, 50),
+}
 
 # ---------------- STRATEGY ----------------
 
 class ChargingStarategy(ABC):
     @abstractmethod
-    def charge_and_pay(self, vechile: Veichle):
+    def charge_and_pay(self, vechile: Veichle, start_hour=None):
+        # start_hour picks the tariff's time-of-use multiplier, as in BatchPricer
         pass
 
 class Level1ACcharge(ChargingStarategy):
-    def charge_and_pay(self, vechile: Veichle):
-        unit_price = 5
-        charge = vechile.curr_charge
-        total_units = 0
+    def __init__(self, tariff: Tariff = None):
+        self.tariff = tariff or TARIFFS[ChargingType.Level1AC]
 
-        while charge < 100:   # FIXED
-            charge += 5
-            total_units += 1
-
-        return total_units * unit_price
+    def charge_and_pay(self, vechile: Veichle, start_hour=None):
+        return self.tariff.price(vechile.curr_charge, start_hour)
 
 class Level2ACcharge(ChargingStarategy):
-    def charge_and_pay(self, vechile: Veichle):
-        unit_price = 10
-        charge = vechile.curr_charge
-        total_units = 0
-
-        while charge < 100:   # FIXED
-            charge += 10
-            total_units += 1
+    def __init__(self, tariff: Tariff = None):
+        self.tariff = tariff or TARIFFS[ChargingType.Level2AC]
 
-        return total_units * unit_price
+    def charge_and_pay(self, vechile: Veichle, start_hour=None):
+        return self.tariff.price(vechile.curr_charge, start_hour)
 
 class DSFastcharge(ChargingStarategy):
-    def charge_and_pay(self, vechile: Veichle):
-        unit_price = 50
-        charge = vechile.curr_charge
-        total_units = 0
-
-        while charge < 100:   # FIXED
-            charge += 20
-            total_units += 1
-
-        return total_units * unit_price
+    def __init__(self, tariff: Tariff = None):
+        self.tariff = tariff or TARIFFS[ChargingType.DCFast]
+
+    def charge_and_pay(self, vechile: Veichle, start_hour=None):
+        return self.tariff.price(vechile.curr_charge, start_hour)
+
+# ---------------- BATCH PRICING ----------------
+
+class BatchPricer:
+    """Prices many sessions in one pass for billing runs.
+
+    Sessions are given column-wise: start charge, ChargingType index (into
+    self.types) and start hour. With NumPy the whole batch is priced with
+    array operations; without it a plain Python loop over the same tables
+    is used.
+    """
+
+    def __init__(self, tariffs=None):
+        tariffs = tariffs or TARIFFS
+        self.types = list(tariffs)
+        self.steps = [tariffs[t].step_percent for t in self.types]
+        self.unit_prices = [tariffs[t].unit_price for t in self.types]
+        self.multipliers = [list(tariffs[t].hourly_multipliers) for t in self.types]
+        if np is not None:
+            self.np_steps = np.array(self.steps, dtype=np.float64)
+            self.np_unit_prices = np.array(self.unit_prices, dtype=np.float64)
+            self.np_multipliers = np.array(self.multipliers, dtype=np.float64)
+
+    def type_index(self, charge_type: ChargingType):
+        return self.types.index(charge_type)
+
+    def price(self, start_charge, type_index, start_hour):
+        if np is None:
+            return [
+                max(0, -((c - 100) // self.steps[t])) * self.unit_prices[t] * self.multipliers[t][h % 24]
+                for c, t, h in zip(start_charge, type_index, start_hour)
+            ]
+
+        start_charge = np.asarray(start_charge, dtype=np.float64)
+        type_index = np.asarray(type_index, dtype=np.intp)
+        start_hour = np.asarray(start_hour, dtype=np.intp) % 24
+        units = np.maximum(0.0, -np.floor_divide(start_charge - 100.0, self.np_steps[type_index]))
+        return units * self.np_unit_prices[type_index] * self.np_multipliers[type_index, start_hour]
 
 # ---------------- FACTORY ----------------
 
 class ChargingFactory:
-    @staticmethod
-    def charing_factroy(vechile: Veichle):
+    def __init__(self, tariffs=None):
+        # Same ChargingType -> Tariff table a BatchPricer takes
+        self.tariffs = tariffs or TARIFFS
+
+    def charing_factroy(self, vechile: Veichle):
         if vechile.charge_type == ChargingType.Level1AC:
-            return Level1ACcharge()
+            return Level1ACcharge(self.tariffs[ChargingType.Level1AC])
         elif vechile.charge_type == ChargingType.Level2AC:
-            return Level2ACcharge()
+            return Level2ACcharge(self.tariffs[ChargingType.Level2AC])
         elif vechile.charge_type == ChargingType.DCFast:
-            return DSFastcharge()
+            return DSFastcharge(self.tariffs[ChargingType.DCFast])
         else:
             raise ValueError("Invalid Charging Type")
 
 # ---------------- POINT ----------------
 
 class Point:
-    def __init__(self, level_type: ChargingType):
+    def __init__(self, level_type: ChargingType, point_id=0):
         self.level_type = level_type
+        self.point_id = point_id
+        self.level_id = None
         self.status = Status.Free   # FIXED
+        self.pool_pos = None        # index in its level's free pool, None if not free
+        self.held = False           # allocated to a charging session
 
 # ---------------- LEVEL ----------------
 
 class ChargingLevel:
     def __init__(self, cols, level_type: ChargingType):
-        self.points = [Point(level_type) for _ in range(cols)]  # FIXED
+        self.level_type = level_type
+        self.level_id = None
+        self.points = [Point(level_type, i) for i in range(cols)]  # FIXED
 
     def get_free_point(self):
         for point in self.points:
@@ -115,40 +190,377 @@ class ChargingLevel:
 class ChargingArea:
     def __init__(self):
         self.levels = []   # FIXED
+        # level_id -> free points of that level. Points are removed by
+        # swapping with the last element, so taking or returning one is O(1).
+        self.free_pools = []
+        # ChargingType -> heap of level ids that may have free points, so
+        # allocation still fills levels in order. Empty levels are dropped
+        # lazily; queued[level_id] says whether a level is in its heap.
+        self.free_levels = {t: [] for t in ChargingType}
+        self.queued = []
+        self.free_totals = {t: 0 for t in ChargingType}
+        # level_id -> {Status: count}
+        self.status_counts = []
 
     def add_level(self, level: ChargingLevel):
+        level.level_id = len(self.levels)
         self.levels.append(level)
+        self.free_pools.append([])
+        self.queued.append(False)
+        self.status_counts.append({s: 0 for s in Status})
+        # Reversed, so a fresh level hands out its points from the first one
+        for point in reversed(level.points):
+            point.level_id = level.level_id
+            self.status_counts[level.level_id][point.status] += 1
+            if point.status == Status.Free:
+                self._add_free(point)
+
+    def _add_free(self, point: Point):
+        pool = self.free_pools[point.level_id]
+        point.pool_pos = len(pool)
+        pool.append(point)
+        self.free_totals[point.level_type] = self.free_totals.get(point.level_type, 0) + 1
+        if not self.queued[point.level_id]:
+            self.queued[point.level_id] = True
+            heapq.heappush(self.free_levels.setdefault(point.level_type, []), point.level_id)
+
+    def _remove_free(self, point: Point):
+        pool = self.free_pools[point.level_id]
+        last = pool.pop()
+        if last is not point:
+            pool[point.pool_pos] = last
+            last.pool_pos = point.pool_pos
+        point.pool_pos = None
+        self.free_totals[point.level_type] -= 1
+
+    def update_status(self, point: Point, status: Status):
+        if point.status == status:
+            return
+        counts = self.status_counts[point.level_id]
+        counts[point.status] -= 1
+        counts[status] += 1
+        if point.status == Status.Free:
+            self._remove_free(point)
+        elif status == Status.Free:
+            self._add_free(point)
+        point.status = status
 
     def allocate_point(self, charge_type: ChargingType):
-        for level in self.levels:
-            point = level.get_free_point()
-            if point and point.level_type == charge_type:
-                point.status = Status.Occupied
-                return point
-        return None
-
+        heap = self.free_levels.get(charge_type)
+        if not heap:
+            return None
+        while not self.free_pools[heap[0]]:
+            self.queued[heapq.heappop(heap)] = False
+            if not heap:
+                return None
+        point = self.free_pools[heap[0]][-1]
+        self.update_status(point, Status.Occupied)
+        point.held = True
+        return point
+
+    def release_point(self, point: Point):
+        if not point.held:
+            raise ValueError("Point is not in use")
+        point.held = False
+        # A point that faulted mid-session stays faulted until telemetry clears it
+        if point.status == Status.Occupied:
+            self.update_status(point, Status.Free)
+
+    def free_count(self, charge_type: ChargingType):
+        return self.free_totals.get(charge_type, 0)
 
     def display_area(self):
         print("\n--- Charging Area Status ---")
-        for idx, level in enumerate(self.levels):
-            level_type = level.points[0].level_type.value
-            print(f"Level {idx} ({level_type}): ", end="")
-
-            for point in level.points:
-                if point.status == Status.Free:
-                    print("F", end=" ")
-                elif point.status == Status.Occupied:
-                    print("O", end=" ")
-                else:
-                    print("X", end=" ")
-            print()
+        for level, counts in zip(self.levels, self.status_counts):
+            print(f"Level {level.level_id} ({level.level_type.value}): "
+                  f"free={counts[Status.Free]} in-use={counts[Status.Occupied]} "
+                  f"fault={counts[Status.Fault]}")
+
+
+
+# ---------------- POWER SCHEDULER ----------------
+
+# Maximum power (kW) a single point of each type can deliver
+POINT_MAX_KW = {
+    ChargingType.Level1AC: 1.9,
+    ChargingType.Level2AC: 7.2,
+    ChargingType.DCFast: 50.0,
+}
+
+
+def water_fill(demands, budget):
+    """Max-min fair water level for {demand: count} under budget.
+
+    Every consumer gets min(demand, level). Runs in O(D log D) for D
+    distinct demand values, independent of how many consumers share them.
+    """
+    remaining = budget
+    consumers = sum(demands.values())
+    for demand in sorted(demands):
+        count = demands[demand]
+        if demand * consumers > remaining:
+            return remaining / consumers
+        remaining -= demand * count
+        consumers -= count
+    return float("inf")
+
+
+class LevelPower:
+    def __init__(self, max_kw):
+        self.max_kw = max_kw
+        self.demand_counts = {}   # session demand (kW) -> active sessions
+        self.total_demand = 0.0
+        self.want = 0.0           # min(max_kw, total_demand), as counted in PowerScheduler.wants
+        self.budget = max_kw
+        self.water = float("inf")
+
+    def draw(self):
+        return min(self.total_demand, self.budget)
+
+
+class PowerScheduler:
+    """Max-min fair power allocation under point, level and station limits.
+
+    A session asks for min(point limit, vehicle limit). The station budget
+    is water-filled across levels, and each level's budget is water-filled
+    across its sessions. A session's allocation is min(demand, level water
+    level), so it is never stored per session. Starting or ending a session
+    re-fills only its own level; the other levels are re-filled only if
+    the station water level moves and changes their budget. The cost
+    depends on distinct demand values, not on the number of sessions.
+    """
+
+    def __init__(self, area: ChargingArea, station_max_kw, level_max_kw, point_max_kw=None):
+        self.area = area
+        self.station_max_kw = station_max_kw
+        self.point_max_kw = point_max_kw or POINT_MAX_KW
+        if not isinstance(level_max_kw, dict):
+            level_max_kw = {level.level_id: level_max_kw for level in area.levels}
+        self.levels = {level_id: LevelPower(kw) for level_id, kw in level_max_kw.items()}
+        # What each level can use, as {want: levels}, for the station water-fill
+        self.wants = {0.0: len(self.levels)}
+        self.total_want = 0.0
+        self.station_water = float("inf")
+        self.sessions = {}   # session id -> (point, demand)
+        self.next_session_id = 1
+
+    def start_session(self, point: Point, vehicle_max_kw=None):
+        demand = self.point_max_kw[point.level_type]
+        if vehicle_max_kw is not None:
+            demand = min(demand, vehicle_max_kw)
+        session_id = self.next_session_id
+        self.next_session_id += 1
+        self.sessions[session_id] = (point, demand)
+
+        level = self.levels[point.level_id]
+        level.demand_counts[demand] = level.demand_counts.get(demand, 0) + 1
+        level.total_demand += demand
+        self._rebalance(level)
+        return session_id
+
+    def end_session(self, session_id):
+        point, demand = self.sessions.pop(session_id)
+        level = self.levels[point.level_id]
+        level.demand_counts[demand] -= 1
+        if not level.demand_counts[demand]:
+            del level.demand_counts[demand]
+        level.total_demand -= demand
+        if not level.demand_counts:
+            level.total_demand = 0.0   # drop accumulated float error
+        self._rebalance(level)
+
+    def _rebalance(self, changed: LevelPower):
+        want = min(changed.max_kw, changed.total_demand)
+        if want != changed.want:
+            # Station budget across levels, each level asking for what it can use
+            wants = self.wants
+            wants[changed.want] -= 1
+            if not wants[changed.want]:
+                del wants[changed.want]
+            wants[want] = wants.get(want, 0) + 1
+            self.total_want += want - changed.want
+            changed.want = want
+            if not self.total_want or self.total_want <= self.station_max_kw:
+                station_water = float("inf")
+            else:
+                station_water = water_fill(wants, self.station_max_kw)
+
+            if station_water != self.station_water:
+                self.station_water = station_water
+                for level in self.levels.values():
+                    budget = min(level.max_kw, station_water)
+                    if budget != level.budget and level is not changed:
+                        level.budget = budget
+                        level.water = water_fill(level.demand_counts, budget)
+
+        changed.budget = min(changed.max_kw, self.station_water)
+        changed.water = water_fill(changed.demand_counts, changed.budget)
+
+    def allocation(self, session_id):
+        point, demand = self.sessions[session_id]
+        return min(demand, self.levels[point.level_id].water)
+
+    def level_draw(self, level_id):
+        return self.levels[level_id].draw()
+
+    def station_draw(self):
+        return sum(level.draw() for level in self.levels.values())
+
+
+# ---------------- SESSIONS ----------------
+
+class SessionEvent(Enum):
+    Start = 1
+    Meter = 2
+    Stop = 3
+
+
+class ChargingSession:
+    def __init__(self, session_id, point: Point, vechile: Veichle, start_time):
+        self.session_id = session_id
+        self.point = point
+        self.vechile = vechile
+        self.start_time = start_time
+        self.end_time = None
+        self.energy_kwh = 0.0
+        self.cost = 0
+
+
+class SessionStore:
+    """Append-only columnar store of session events.
+
+    Each column is its own file of fixed-width native values, so a report
+    reads only the columns it needs, in order, straight from an mmap (as a
+    NumPy memmap when NumPy is available). Rows are buffered and written
+    every flush_every events; flush() fsyncs them, and reading a column
+    flushes first, so reports always include every appended event.
+    """
+
+    COLUMNS = (
+        ("event", "b"),
+        ("session_id", "q"),
+        ("timestamp", "d"),
+        ("level_id", "i"),
+        ("charge_type", "b"),   # index into CHARGE_TYPES
+        ("energy_kwh", "d"),    # meter reading so far
+        ("cost", "d"),
+    )
+    CHARGE_TYPES = list(ChargingType)
+
+    def __init__(self, directory, flush_every=4096):
+        self.directory = directory
+        self.flush_every = flush_every
+        os.makedirs(directory, exist_ok=True)
+        self.buffers = {name: array(code) for name, code in self.COLUMNS}
+
+        # Columns can disagree after a crash mid-flush; keep the common prefix
+        self.rows = min(self._file_rows(name, code) for name, code in self.COLUMNS)
+        for name, code in self.COLUMNS:
+            with open(self._path(name), "ab") as f:
+                f.truncate(self.rows * array(code).itemsize)
+        self.files = {name: open(self._path(name), "ab") for name, _ in self.COLUMNS}
+        session_ids = self.column("session_id")
+        if not self.rows:
+            self.last_session_id = 0
+        elif np is not None:
+            self.last_session_id = int(session_ids.max())
+        else:
+            self.last_session_id = max(session_ids)
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.col")
 
+    def _file_rows(self, name, code):
+        path = self._path(name)
+        return os.path.getsize(path) // array(code).itemsize if os.path.exists(path) else 0
+
+    def append(self, event: SessionEvent, session: ChargingSession, timestamp):
+        row = (event.value, session.session_id, timestamp, session.point.level_id,
+               self.CHARGE_TYPES.index(session.point.level_type), session.energy_kwh, session.cost)
+        for (name, _), value in zip(self.COLUMNS, row):
+            self.buffers[name].append(value)
+        if len(self.buffers["event"]) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.buffers["event"]:
+            return
+        for name, _ in self.COLUMNS:
+            buffer = self.buffers[name]
+            f = self.files[name]
+            buffer.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+            del buffer[:]
+        self.rows = self._file_rows("event", "b")
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+    def column(self, name):
+        """All values of a column, mapped read-only from disk."""
+        self.flush()
+        code = dict(self.COLUMNS)[name]
+        if not self.rows:
+            return np.empty(0, dtype=code) if np is not None else []
+        if np is not None:
+            return np.memmap(self._path(name), dtype=code, mode="r", shape=(self.rows,))
+        with open(self._path(name), "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)[:self.rows * array(code).itemsize].cast(code)
+
+    # ---- reports ----
+    def energy_per_level_per_day(self):
+        """{(level_id, day number since epoch): kWh} over finished sessions."""
+        event, level, ts, energy = (self.column(n) for n in ("event", "level_id", "timestamp", "energy_kwh"))
+        if np is not None:
+            stop = np.asarray(event) == SessionEvent.Stop.value
+            if not stop.any():
+                return {}
+            # Pack (day, level) into one int64 so grouping is a 1-D unique
+            days = (np.asarray(ts)[stop] // 86400).astype(np.int64)
+            keys = (days << 20) | np.asarray(level)[stop].astype(np.int64)
+            unique, inverse = np.unique(keys, return_inverse=True)
+            totals = np.bincount(inverse, weights=np.asarray(energy)[stop])
+            return {(int(k & 0xFFFFF), int(k >> 20)): float(t) for k, t in zip(unique, totals)}
+
+        totals = {}
+        for e, l, t, kwh in zip(event, level, ts, energy):
+            if e == SessionEvent.Stop.value:
+                key = (l, int(t // 86400))
+                totals[key] = totals.get(key, 0.0) + kwh
+        return totals
+
+    def revenue_per_type(self):
+        event, charge_type, cost = (self.column(n) for n in ("event", "charge_type", "cost"))
+        if np is not None:
+            stop = np.asarray(event) == SessionEvent.Stop.value
+            totals = np.bincount(np.asarray(charge_type)[stop], weights=np.asarray(cost)[stop],
+                                 minlength=len(self.CHARGE_TYPES))
+            return {t: float(v) for t, v in zip(self.CHARGE_TYPES, totals)}
+
+        totals = {t: 0.0 for t in self.CHARGE_TYPES}
+        for e, c, v in zip(event, charge_type, cost):
+            if e == SessionEvent.Stop.value:
+                totals[self.CHARGE_TYPES[c]] += v
+        return totals
 
 
 class EVChargingService:
-    def __init__(self, charging_area: ChargingArea, charging_factory: ChargingFactory):
+    def __init__(self, charging_area: ChargingArea, charging_factory: ChargingFactory,
+                 session_store: SessionStore = None, clock=time.time):
         self.charging_area = charging_area
         self.charging_factory = charging_factory
+        self.session_store = session_store
+        self.clock = clock
+        self.active_sessions = {}
+        self.next_session_id = (session_store.last_session_id if session_store else 0) + 1
+
+    def _record(self, event: SessionEvent, session: ChargingSession, timestamp):
+        if self.session_store:
+            self.session_store.append(event, session, timestamp)
 
     def charge_vechile(self, vechile: Veichle):
         point = self.charging_area.allocate_point(vechile.charge_type)
@@ -157,15 +569,348 @@ class EVChargingService:
             print("No charging point available")
             return
 
-        strategy = self.charging_factory.charing_factroy(vechile)  # FIXED
-        cost = strategy.charge_and_pay(vechile)
+        session = ChargingSession(self.next_session_id, point, vechile, self.clock())
+        self.next_session_id += 1
+        self.active_sessions[session.session_id] = session
+        self._record(SessionEvent.Start, session, session.start_time)
 
         print(f"Charging started for {vechile.charge_type.value}")
-        print(f"Total cost: ₹{cost}")
+        return session
+
+    def meter_update(self, session: ChargingSession, energy_kwh):
+        session.energy_kwh = energy_kwh
+        self._record(SessionEvent.Meter, session, self.clock())
+
+    def stop_charging(self, session: ChargingSession):
+        self.active_sessions.pop(session.session_id)
+        session.end_time = self.clock()
+        if not session.energy_kwh:
+            # No meter readings: assume the battery was topped up to 100%
+            session.energy_kwh = max(0, 100 - session.vechile.curr_charge) / 100 * session.vechile.battery_kwh
+
+        strategy = self.charging_factory.charing_factroy(session.vechile)  # FIXED
+        session.cost = strategy.charge_and_pay(session.vechile, time.localtime(session.start_time).tm_hour)
+        self._record(SessionEvent.Stop, session, session.end_time)
+        self.charging_area.release_point(session.point)
+
+        print(f"Charging stopped for {session.vechile.charge_type.value}: "
+              f"{session.energy_kwh:.1f} kWh, total cost: ₹{session.cost}")
+        return session.cost
+
+# ---------------- TELEMETRY ----------------
+
+class TelemetryService:
+    """Asyncio ingestion of newline-delimited JSON telemetry from chargers.
+
+    One line per reading: {"level": 0, "point": 3, "status": "FAULT",
+    "energy_kwh": 1.25}; status and energy_kwh are each optional.
+    Readings are queued and applied to the ChargingArea in batches. Each
+    batch publishes its status changes to subscribers once (Observer).
+    Invalid readings are counted as malformed and skipped one by one; a
+    FREE status for a point still held by a session is refused (counted
+    in rejected_status), since only stopping the session may free it.
+    """
+
+    def __init__(self, charging_area: ChargingArea, batch_size=1024, batch_interval=0.05):
+        self.charging_area = charging_area
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.pending = []
+        self.subscribers = []
+        self.energy_kwh = {}   # (level_id, point_id) -> cumulative kWh
+        self.events_ingested = 0
+        self.malformed = 0
+        self.rejected_status = 0
+        self.server = None
+        self._flusher = None
+
+    def subscribe(self, callback):
+        # callback(list of (point, old status, new status))
+        self.subscribers.append(callback)
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        if path:
+            self.server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self._flusher.cancel()
+        self.apply_batch()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    self.pending.append(json.loads(line))
+                except ValueError:
+                    self.malformed += 1
+                    continue
+                if len(self.pending) >= self.batch_size:
+                    self.apply_batch()
+        finally:
+            writer.close()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            try:
+                self.apply_batch()
+            except Exception as e:   # keep flushing later batches
+                print(f"Telemetry batch failed: {e!r}")
+
+    def _parse(self, reading):
+        """(point, energy or None, Status or None) for a valid reading, else None."""
+        try:
+            level, index = reading["level"], reading["point"]
+            if type(level) is not int or type(index) is not int or level < 0 or index < 0:
+                return None
+            point = self.charging_area.levels[level].points[index]
+            energy = reading.get("energy_kwh")
+            status = reading.get("status")
+            if energy is not None:
+                if type(energy) not in (int, float) or not math.isfinite(energy):
+                    return None
+            if status is not None:
+                status = Status(status)
+        except (KeyError, IndexError, TypeError, AttributeError, ValueError):
+            return None
+        return point, energy, status
+
+    def apply_batch(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        changes = []
+        for reading in batch:
+            parsed = self._parse(reading)
+            if parsed is None:
+                self.malformed += 1
+                continue
+            point, energy, status = parsed
+            if energy is not None:
+                key = (point.level_id, point.point_id)
+                self.energy_kwh[key] = self.energy_kwh.get(key, 0.0) + energy
+            if status is not None and status != point.status:
+                if status == Status.Free and point.held:
+                    self.rejected_status += 1
+                else:
+                    old = point.status
+                    self.charging_area.update_status(point, status)
+                    changes.append((point, old, status))
+            self.events_ingested += 1
+
+        if changes:
+            for callback in self.subscribers:
+                try:
+                    callback(changes)
+                except Exception as e:
+                    print(f"Telemetry subscriber failed: {e!r}")
+
+
+async def simulate_chargers(host, port, charging_area: ChargingArea, chargers=100, readings_per_charger=2000,
+                            fault_rate=0.001, seed=9):
+    """Each simulated charger streams meter readings and occasional faults."""
+    rng = random.Random(seed)
+    points = [p for level in charging_area.levels for p in level.points]
+
+    async def charger(point):
+        _, writer = await asyncio.open_connection(host, port)
+        lines = []
+        for _ in range(readings_per_charger):
+            reading = {"level": point.level_id, "point": point.point_id, "energy_kwh": 0.05}
+            r = rng.random()
+            if r < fault_rate:
+                reading["status"] = Status.Fault.value
+            elif r < 2 * fault_rate:
+                reading["status"] = Status.Free.value
+            lines.append(json.dumps(reading))
+            if len(lines) == 256:
+                writer.write(("\n".join(lines) + "\n").encode())
+                lines = []
+                await writer.drain()
+        if lines:
+            writer.write(("\n".join(lines) + "\n").encode())
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    await asyncio.gather(*(charger(points[i % len(points)]) for i in range(chargers)))
+
+
+# ---------------- BENCHMARK ----------------
+
+def benchmark_allocation(levels=40, points_per_level=100, operations=500_000):
+    types = list(ChargingType)
+    area = ChargingArea()
+    for i in range(levels):
+        area.add_level(ChargingLevel(points_per_level, types[i % len(types)]))
+
+    rng = random.Random(7)
+    in_use = []
+    start = time.perf_counter()
+    for _ in range(operations):
+        if in_use and (rng.random() < 0.5 or len(in_use) > levels * points_per_level * 0.9):
+            area.release_point(in_use.pop(rng.randrange(len(in_use))))
+        else:
+            point = area.allocate_point(types[rng.randrange(len(types))])
+            if point:
+                in_use.append(point)
+    elapsed = time.perf_counter() - start
+    print(f"{levels * points_per_level} points: {operations / elapsed:,.0f} allocate/release ops/s")
+
+
+def benchmark_billing(sessions=2_000_000):
+    peak = [1.0] * 24
+    for hour in range(17, 22):
+        peak[hour] = 1.5
+    tariffs = {
+        ChargingType.Level1AC: Tariff(5, 5, peak),
+        ChargingType.Level2AC: Tariff(10, 10, peak),
+        ChargingType.DCFast: Tariff(20, 50, peak),
+    }
+    pricer = BatchPricer(tariffs)
+    rng = random.Random(11)
+    if np is not None:
+        np_rng = np.random.default_rng(11)
+        start_charge = np_rng.integers(0, 100, sessions)
+        type_index = np_rng.integers(0, len(pricer.types), sessions)
+        start_hour = np_rng.integers(0, 24, sessions)
+    else:
+        start_charge = [rng.randrange(100) for _ in range(sessions)]
+        type_index = [rng.randrange(len(pricer.types)) for _ in range(sessions)]
+        start_hour = [rng.randrange(24) for _ in range(sessions)]
+
+    start = time.perf_counter()
+    prices = pricer.price(start_charge, type_index, start_hour)
+    batch_elapsed = time.perf_counter() - start
+    total = float(prices.sum()) if np is not None else sum(prices)
+
+    # Per-session strategy calls on a sample, for comparison; both paths
+    # must agree on every price
+    sample = 200_000
+    factory = ChargingFactory(tariffs)
+    vehicles = [Veichle(int(start_charge[i]), pricer.types[int(type_index[i])]) for i in range(sample)]
+    strategies = [factory.charing_factroy(Veichle(0, t)) for t in pricer.types]
+    hours = [int(start_hour[i]) for i in range(sample)]
+    start = time.perf_counter()
+    per_session_prices = [strategies[int(type_index[i])].charge_and_pay(vehicle, hours[i])
+                          for i, vehicle in enumerate(vehicles)]
+    per_session = (time.perf_counter() - start) / sample
+    if any(abs(a - b) > 1e-9 for a, b in zip(per_session_prices, prices[:sample])):
+        raise Exception("Strategy and batch prices disagree")
+
+    print(f"{sessions:,} sessions priced in {batch_elapsed:.2f}s "
+          f"({sessions / batch_elapsed:,.0f}/s, {'numpy' if np is not None else 'pure python'}); "
+          f"per-session path {1 / per_session:,.0f}/s; total revenue {total:,.0f}")
+
+
+def benchmark_power_scheduler(levels=20, points_per_level=250, events=200_000):
+    types = list(ChargingType)
+    area = ChargingArea()
+    for i in range(levels):
+        area.add_level(ChargingLevel(points_per_level, types[i % len(types)]))
+    scheduler = PowerScheduler(area, station_max_kw=1500, level_max_kw=150)
+
+    rng = random.Random(3)
+    active = []
+    start = time.perf_counter()
+    for _ in range(events):
+        # Drift towards ~80% of points busy, then churn around it
+        if active and (rng.random() < 0.4 or len(active) > levels * points_per_level * 0.8):
+            session_id, point = active.pop(rng.randrange(len(active)))
+            scheduler.end_session(session_id)
+            area.release_point(point)
+        else:
+            point = area.allocate_point(types[rng.randrange(len(types))])
+            if point:
+                vehicle_kw = rng.choice((None, 3.6, 11.0, 22.0))
+                active.append((scheduler.start_session(point, vehicle_kw), point))
+    elapsed = time.perf_counter() - start
+    print(f"{len(active)} concurrent sessions: {elapsed / events * 1e6:.1f} us/event, "
+          f"station draw {scheduler.station_draw():.1f}/{scheduler.station_max_kw} kW")
+
+
+def benchmark_session_reports(sessions=1_000_000, directory="ev_sessions_bench"):
+    import shutil
+
+    shutil.rmtree(directory, ignore_errors=True)
+    types = list(ChargingType)
+    area = ChargingArea()
+    for i in range(12):
+        area.add_level(ChargingLevel(50, types[i % len(types)]))
+    store = SessionStore(directory)
+    rng = random.Random(5)
+
+    # Write Start/Stop rows directly to measure the store, not the service
+    start = time.perf_counter()
+    for i in range(sessions):
+        level = area.levels[rng.randrange(len(area.levels))]
+        session = ChargingSession(i + 1, level.points[0], None, i * 30.0)
+        store.append(SessionEvent.Start, session, session.start_time)
+        session.energy_kwh = rng.uniform(5, 60)
+        session.cost = rng.randrange(50, 500)
+        store.append(SessionEvent.Stop, session, session.start_time + 3600)
+    store.flush()
+    write_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    energy = store.energy_per_level_per_day()
+    revenue = store.revenue_per_type()
+    report_elapsed = time.perf_counter() - start
+    store.close()
+    size_mb = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) / 1e6
+    shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{sessions:,} sessions: write {2 * sessions / write_elapsed:,.0f} events/s, "
+          f"{size_mb:.0f} MB on disk, reports in {report_elapsed:.2f}s "
+          f"({len(energy)} level-days, revenue {sum(revenue.values()):,.0f})")
+
+
+def benchmark_telemetry(chargers=100, readings_per_charger=2000):
+    area = ChargingArea()
+    for ct in ChargingType:
+        area.add_level(ChargingLevel(50, ct))
+    service = TelemetryService(area)
+    status_changes = []
+    service.subscribe(status_changes.extend)
+
+    async def run():
+        server = await service.start()
+        host, port = server.sockets[0].getsockname()[:2]
+        start = time.perf_counter()
+        await simulate_chargers(host, port, area, chargers, readings_per_charger)
+        total = chargers * readings_per_charger
+        while service.events_ingested + service.malformed + len(service.pending) < total:
+            await asyncio.sleep(0.01)
+        await service.stop()
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    print(f"{chargers} chargers: {service.events_ingested / elapsed:,.0f} telemetry events/s ingested, "
+          f"{len(status_changes)} status changes published")
+
 
 # ---------------- MAIN ----------------
 
 if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        benchmark_allocation()
+        benchmark_billing()
+        benchmark_power_scheduler()
+        benchmark_session_reports()
+        benchmark_telemetry()
+        sys.exit()
+
     charging_area = ChargingArea()
 
     charging_area.add_level(ChargingLevel(10, ChargingType.Level1AC))
@@ -179,8 +924,11 @@ if __name__ == "__main__":
     vechile1 = Veichle(0, ChargingType.Level1AC)
     vechile2 = Veichle(0, ChargingType.DCFast)
     charging_area.display_area()
-    ev_service.charge_vechile(vechile1)
-    ev_service.charge_vechile(vechile2)
+    session1 = ev_service.charge_vechile(vechile1)
+    session2 = ev_service.charge_vechile(vechile2)
 
     charging_area.display_area()
 
+    ev_service.stop_charging(session1)
+    ev_service.stop_charging(session2)
+
@@ -16,48 +16,229 @@
 # Auditing: Design should cater to following use cases:
 # Given a bookId, give a list of users having that book
 # Given a userId, list of books issued to him
+import os
 import random
+import threading
+import time
+from collections import deque
+from enum import Enum
 
 class IdGenerator:
-    def __init__(self,title):
-        self.title = title
-        self.randint = random.randint(1,10000)
+    """Per-prefix sequential book ids: ROW0001, ROW0002, ...
+
+    The prefix is the first three letters of the author's last name. The
+    counters are persisted in blocks: each reservation appends a
+    "<prefix> <highest reserved sequence>" line to the file, and ids are
+    handed out from memory until the block runs out. After a restart
+    allocation resumes past the last reserved block, which may leave gaps
+    but never reuses an id. The file is compacted to one line per prefix
+    on load.
+    """
+
+    def __init__(self,path=None,block_size=1000,width=4):
+        self.path = path
+        self.block_size = block_size
+        self.width = width
+        self.lock = threading.Lock()
+        self.next_seq = {}   # prefix -> next sequence to hand out
+        self.reserved = {}   # prefix -> highest persisted sequence
+        self.file = None
+        if path:
+            if os.path.exists(path):
+                with open(path) as f:
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) == 2 and parts[1].isdigit():   # skip a torn last line
+                            self.reserved[parts[0]] = max(self.reserved.get(parts[0], 0), int(parts[1]))
+                self.next_seq = {prefix: high + 1 for prefix, high in self.reserved.items()}
+                self._compact()
+            self.file = open(path, "a")
+
+    @staticmethod
+    def prefix(author):
+        last_name = "".join(ch for ch in author.split()[-1] if ch.isalpha()) if author.split() else ""
+        return (last_name.upper() + "XXX")[:3]
+
+    def _compact(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(f"{prefix} {high}\n" for prefix, high in self.reserved.items())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _persist(self,prefix):
+        self.file.write(f"{prefix} {self.reserved[prefix]}\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def _take(self,prefix,count):
+        with self.lock:
+            first = self.next_seq.get(prefix, 1)
+            last = first + count - 1
+            self.next_seq[prefix] = last + 1
+            if last > self.reserved.get(prefix, 0):
+                self.reserved[prefix] = last + self.block_size
+                if self.file:
+                    self._persist(prefix)
+        return first
+
+    def generate_id(self,author):
+        prefix = self.prefix(author)
+        return f"{prefix}{self._take(prefix, 1):0{self.width}d}"
 
-    def generate_id(self,title):
-        return self.title[:2]+str(self.randint)
+    def generate_ids(self,author,count):
+        """Reserve count consecutive ids for one author in a single step."""
+        prefix = self.prefix(author)
+        first = self._take(prefix, count)
+        return [f"{prefix}{seq:0{self.width}d}" for seq in range(first, first + count)]
 
 class Book:
-    def __int__(self,title,author,users,istaken,id):
-        self.id = IdGenerator.generate_id(title)
+    def __init__(self,title,author,copies=1,book_id=None):
+        self.id = book_id   # assigned by Catalog.add_book when not given
         self.title = title
         self.author = author
-        self.users = []
-        self.istaken = False
+        self.copies = copies
+        self.available = copies   # copies on the shelf, not held for the waitlist
+        self.held = 0             # returned copies held for the head of the waitlist
+        self.waitlist = deque()   # user ids, FIFO
+        self.waiting = set()      # same ids, for O(1) membership / lazy removal
 
 
 
 class User:
-    def __init__(self,name,id,book_list):
+    def __init__(self,name,id,book_list=None):
         self.name = name
         self.id = id
-        self.book_list = book_list
+        self.book_list = book_list if book_list is not None else []
+        self.waiting_for = set()   # book ids this user is waitlisted on
+
+
+LOAN_DAYS = 14
+FINE_PER_DAY = 20
+SECONDS_PER_DAY = 86400
+
+class Loan:
+    def __init__(self,book_id,user_id,issued_at):
+        self.book_id = book_id
+        self.user_id = user_id
+        self.issued_at = issued_at
+        self.due_day = int(issued_at // SECONDS_PER_DAY) + LOAN_DAYS
+        self.fine = 0
+
+
+class FineTracker:
+    """Due-date bucket queue over active loans.
+
+    Loans sit in a bucket per due day until that day passes, then move to
+    the overdue set. A nightly run only touches the buckets that just
+    expired. Fines are never rewritten per loan per day: a loan owes
+    (today - due_day) * FINE_PER_DAY, and the total owed over all overdue
+    loans is kept from a running count and a running sum of due days.
+    """
+
+    def __init__(self,start_day=0):
+        self.buckets = {}        # due day -> {(user id, book id): Loan}
+        self.overdue = {}        # (user id, book id) -> Loan
+        self.overdue_due_sum = 0
+        self.today = start_day
+        self.collected = 0       # fines charged on return
+
+    def track(self,loan:Loan):
+        key = (loan.user_id, loan.book_id)
+        if loan.due_day < self.today:
+            self.overdue[key] = loan
+            self.overdue_due_sum += loan.due_day
+        else:
+            self.buckets.setdefault(loan.due_day, {})[key] = loan
+
+    def untrack(self,loan:Loan,return_day):
+        key = (loan.user_id, loan.book_id)
+        if self.overdue.pop(key, None) is not None:
+            self.overdue_due_sum -= loan.due_day
+        else:
+            bucket = self.buckets.get(loan.due_day)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self.buckets[loan.due_day]
+        loan.fine = max(0, return_day - loan.due_day) * FINE_PER_DAY
+        self.collected += loan.fine
+        return loan.fine
+
+    def advance_to(self,day):
+        """Move the clock to day; return the loans that just became overdue."""
+        newly_overdue = []
+        for due_day in range(self.today, day):
+            bucket = self.buckets.pop(due_day, None)
+            if bucket:
+                newly_overdue.extend(bucket.values())
+                self.overdue.update(bucket)
+                self.overdue_due_sum += due_day * len(bucket)
+        self.today = day
+        return newly_overdue
+
+    def accrued_today(self):
+        return len(self.overdue) * FINE_PER_DAY
+
+    def total_outstanding(self):
+        return (len(self.overdue) * self.today - self.overdue_due_sum) * FINE_PER_DAY
+
+    def nightly_report(self):
+        """Stream (user id, book id, days overdue, fine so far) rows."""
+        today = self.today
+        for (user_id, book_id), loan in self.overdue.items():
+            days = today - loan.due_day
+            yield user_id, book_id, days, days * FINE_PER_DAY
+
+
+class BorrowResult(Enum):
+    ISSUED = "ISSUED"
+    WAITLISTED = "WAITLISTED"
+    ALREADY_BORROWED = "ALREADY_BORROWED"
+    ALREADY_WAITING = "ALREADY_WAITING"
 
 
 class Catalog:
-    def __init__(self):
-        self.books = []
+    def __init__(self,id_generator=None):
+        self.id_generator = id_generator or IdGenerator()
+        self.books = {}            # book id -> Book
+        self.books_by_title = {}   # title -> [Book]
 
     def add_book(self,book:Book):
-        self.books.append(Book)
+        if book.id is None:
+            book.id = self.id_generator.generate_id(book.author)
+        if book.id in self.books:
+            raise ValueError(f"Book id {book.id} already exists")
+        self.books[book.id] = book
+        self.books_by_title.setdefault(book.title, []).append(book)
+
+    def import_books(self,books):
+        """Bulk add: ids are reserved once per author instead of per book."""
+        by_author = {}
+        for book in books:
+            if book.id is None:
+                by_author.setdefault(book.author, []).append(book)
+        for author, author_books in by_author.items():
+            for book, book_id in zip(author_books, self.id_generator.generate_ids(author, len(author_books))):
+                book.id = book_id
+        for book in books:
+            self.add_book(book)
+
+    def get_book(self,book_id):
+        book = self.books.get(book_id)
+        if book is None:
+            raise ValueError("There is no such book")
+        return book
 
     def search_book(self,title):
-        for book in self.books:
-            if book.title==title:
-                return book
-        raise ValueError("There is no such book")
+        books = self.books_by_title.get(title)
+        if not books:
+            raise ValueError("There is no such book")
+        return books[0]
 
     def list_books(self):
-        for book in self.books:
+        for book in self.books.values():
             print(f"{book.title} {book.author}")
             print("----------------------------")
 
@@ -65,15 +246,274 @@ class Catalog:
 
 
 class Library:
-    def __init__(self):
-        self.users = []
+    def __init__(self,catalog=None,clock=time.time):
+        self.catalog = catalog or Catalog()
+        self.clock = clock
+        self.fines = FineTracker(int(clock() // SECONDS_PER_DAY))
+        self.users = {}            # user id -> User
+        self.users_by_name = {}    # name -> User
+        # Bidirectional issue indexes: book id -> {user id: Loan} and back
+        self.issues_by_book = {}
+        self.issues_by_user = {}
 
     def add_user(self,user:User):
-        self.users.append(user)
+        self.users[user.id] = user
+        self.users_by_name[user.name] = user
 
     def remove_user(self,user_name):
-        for user in self.users:
-            if user.name == user_name:
-                self.users.remove(user)
-        print("There is no such user")
+        user = self.users_by_name.get(user_name)
+        if user is None:
+            print("There is no such user")
+            return
+        if self.issues_by_user.get(user.id):
+            raise ValueError("User still has borrowed books")
+        for book_id in user.waiting_for:
+            book = self.catalog.get_book(book_id)
+            book.waiting.discard(user.id)
+            # Pass a copy held for this user on to the next head, or shelve it
+            self._waitlist_head(book)
+        del self.users_by_name[user_name]
+        del self.users[user.id]
+
+    def _get_user(self,user_id):
+        user = self.users.get(user_id)
+        if user is None:
+            raise ValueError("There is no such user")
+        return user
+
+    @staticmethod
+    def _waitlist_head(book):
+        # Users who left the queue are only dropped from the set; skip them here
+        while book.waitlist and book.waitlist[0] not in book.waiting:
+            book.waitlist.popleft()
+        # Holds beyond the remaining waiters go back on the shelf
+        if book.held > len(book.waiting):
+            book.available += book.held - len(book.waiting)
+            book.held = len(book.waiting)
+        return book.waitlist[0] if book.waitlist else None
+
+    def borrow_book(self,user_id,book_id):
+        user = self._get_user(user_id)
+        book = self.catalog.get_book(book_id)
+        user_loans = self.issues_by_user.setdefault(user_id, {})
+        if book_id in user_loans:
+            return BorrowResult.ALREADY_BORROWED
+
+        head = self._waitlist_head(book)
+        if head == user_id and book.held:
+            book.waitlist.popleft()
+            book.waiting.discard(user_id)
+            user.waiting_for.discard(book_id)
+            book.held -= 1
+        elif user_id in book.waiting:
+            return BorrowResult.ALREADY_WAITING
+        elif book.available:
+            # Shelf copies exist only once every waiter has one held
+            book.available -= 1
+        else:
+            book.waitlist.append(user_id)
+            book.waiting.add(user_id)
+            user.waiting_for.add(book_id)
+            return BorrowResult.WAITLISTED
+
+        loan = Loan(book_id, user_id, self.clock())
+        user_loans[book_id] = loan
+        self.issues_by_book.setdefault(book_id, {})[user_id] = loan
+        self.fines.track(loan)
+        return BorrowResult.ISSUED
+
+    def return_book(self,user_id,book_id):
+        loan = self.issues_by_user.get(user_id, {}).pop(book_id, None)
+        if loan is None:
+            raise ValueError("This book is not issued to the user")
+        del self.issues_by_book[book_id][user_id]
+        self.fines.untrack(loan, int(self.clock() // SECONDS_PER_DAY))
+        book = self.catalog.get_book(book_id)
+        # A returned copy is held for a waiter who has none yet, else shelved
+        self._waitlist_head(book)
+        if book.held < len(book.waiting):
+            book.held += 1
+        else:
+            book.available += 1
+        return loan
+
+    def run_nightly(self,report_path=None):
+        """Advance fines to the current day; optionally stream the fine report to a CSV."""
+        newly_overdue = self.fines.advance_to(int(self.clock() // SECONDS_PER_DAY))
+        if report_path:
+            with open(report_path, "w") as f:
+                f.write("user_id,book_id,days_overdue,fine\n")
+                for row in self.fines.nightly_report():
+                    f.write(",".join(map(str, row)) + "\n")
+        return newly_overdue
+
+    def users_with_book(self,book_id):
+        return [self.users[user_id] for user_id in self.issues_by_book.get(book_id, {})]
+
+    def books_of_user(self,user_id):
+        return [self.catalog.books[book_id] for book_id in self.issues_by_user.get(user_id, {})]
+
+
+# ---------------- BENCHMARK ----------------
+
+def benchmark_id_allocation(ids=1_000_000, authors=10_000, path="book_ids_bench.log"):
+    if os.path.exists(path):
+        os.remove(path)
+    generator = IdGenerator(path)
+    names = [f"Author {chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i // 676 % 26)}" for i in range(authors)]
+
+    start = time.perf_counter()
+    for i in range(ids):
+        generator.generate_id(names[i % authors])
+    single = ids / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(ids // 1000):
+        generator.generate_ids(names[i % authors], 1000)
+    bulk = ids / (time.perf_counter() - start)
+
+    generator.file.close()
+    resumed = IdGenerator(path).generate_id(names[0])
+    os.remove(path)
+    print(f"id allocation: {single:,.0f} ids/s single, {bulk:,.0f} ids/s bulk; after restart -> {resumed}")
+
+
+def benchmark_fines(loans=2_000_000, days=120, users=200_000, books=500_000, seed=2):
+    """Simulated clock: borrows spread over days, most returned on time."""
+    rng = random.Random(seed)
+    now = [0.0]
+    library = Library(clock=lambda: now[0])
+    for i in range(books):
+        library.catalog.add_book(Book(f"Title {i}", "Author", 1_000, f"B{i}"))
+    for i in range(users):
+        library.add_user(User(f"user{i}", i))
+
+    per_day = loans // days
+    returns_by_day = {}
+    nightly_seconds = []
+    newly_overdue_total = 0
+    start = time.perf_counter()
+    for day in range(days):
+        now[0] = day * SECONDS_PER_DAY
+        for user_id, book_id in returns_by_day.pop(day, ()):
+            library.return_book(user_id, book_id)
+        for _ in range(per_day):
+            user_id, book_id = rng.randrange(users), f"B{rng.randrange(books)}"
+            if library.borrow_book(user_id, book_id) == BorrowResult.ISSUED:
+                # ~20% come back late, some very late
+                keep = rng.randrange(1, LOAN_DAYS + 1) if rng.random() < 0.8 else rng.randrange(LOAN_DAYS + 1, 60)
+                returns_by_day.setdefault(day + keep, []).append((user_id, book_id))
+        night = time.perf_counter()
+        newly_overdue_total += len(library.run_nightly())
+        nightly_seconds.append(time.perf_counter() - night)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report_rows = sum(1 for _ in library.fines.nightly_report())
+    report_elapsed = time.perf_counter() - start
+    print(f"{per_day * days:,} simulated loans over {days} days in {elapsed:.1f}s; "
+          f"nightly run max {max(nightly_seconds) * 1000:.1f} ms, "
+          f"{newly_overdue_total:,} became overdue, {len(library.fines.overdue):,} overdue now, "
+          f"outstanding ₹{library.fines.total_outstanding():,}, collected ₹{library.fines.collected:,}; "
+          f"report streamed {report_rows:,} rows in {report_elapsed:.2f}s")
+
+
+def benchmark_lending(books=1_000_000, users=100_000, loans=10_000_000, seed=1):
+    rng = random.Random(seed)
+    library = Library()
+    start = time.perf_counter()
+    for i in range(books):
+        library.catalog.add_book(Book(f"Title {i}", f"Author {i % 5000}", 1 + i % 3, f"B{i}"))
+    for i in range(users):
+        library.add_user(User(f"user{i}", i))
+    setup = time.perf_counter() - start
+
+    # Each operation is a borrow (issue or waitlist) or a return of a random active loan
+    active = []
+    issued = waitlisted = returned = 0
+    start = time.perf_counter()
+    for _ in range(loans):
+        if active and rng.random() < 0.4:
+            i = rng.randrange(len(active))
+            active[i], active[-1] = active[-1], active[i]
+            user_id, book_id = active.pop()
+            library.return_book(user_id, book_id)
+            returned += 1
+            continue
+        user_id = rng.randrange(users)
+        # One borrow in five goes to the 1,000 most popular titles
+        book_id = f"B{rng.randrange(1000 if rng.random() < 0.2 else books)}"
+        result = library.borrow_book(user_id, book_id)
+        if result == BorrowResult.ISSUED:
+            active.append((user_id, book_id))
+            issued += 1
+        elif result == BorrowResult.WAITLISTED:
+            waitlisted += 1
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(100_000):
+        library.users_with_book(f"B{i % books}")
+        library.books_of_user(i % users)
+    audit_us = (time.perf_counter() - start) / 200_000 * 1e6
+
+    print(f"{books:,} books loaded in {setup:.1f}s; {loans:,} operations at {loans / elapsed:,.0f}/s "
+          f"({issued:,} issued, {waitlisted:,} waitlisted, {returned:,} returned); "
+          f"audit queries {audit_us:.2f} us")
+
+
+def check_waitlist_holds():
+    """Held copies never outnumber waiters, so nobody queues while a copy sits on the shelf."""
+    library = Library()
+    book = Book("Emma", "Jane Austen", 3, book_id="AUS0001")
+    library.catalog.add_book(book)
+    for user_id in range(1, 7):
+        library.add_user(User(f"user{user_id}", user_id))
+
+    for user_id in (1, 2, 3):
+        library.borrow_book(user_id, book.id)
+    for user_id in (4, 5):
+        library.borrow_book(user_id, book.id)       # waitlisted
+    for user_id in (1, 2, 3):
+        library.return_book(user_id, book.id)
+    if (book.held, book.available) != (2, 1):
+        raise AssertionError(f"after returns: held={book.held}, available={book.available}")
+    result = library.borrow_book(6, book.id)
+    if result != BorrowResult.ISSUED:
+        raise AssertionError(f"new borrower got {result} with a copy on the shelf")
+
+    # Removing a waiter hands their held copy back to the shelf
+    library.remove_user("user5")
+    if (book.held, book.available) != (1, 1):
+        raise AssertionError(f"after remove_user: held={book.held}, available={book.available}")
+    print("Waitlist holds: OK")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--check" in sys.argv:
+        check_waitlist_holds()
+        sys.exit()
+
+    if "--bench" in sys.argv:
+        benchmark_id_allocation()
+        benchmark_lending()
+        benchmark_fines()
+        sys.exit()
+
+    catalog = Catalog()
+    library = Library(catalog)
+    catalog.add_book(Book("Harry Potter", "J. K. Rowling", 1))
+    catalog.import_books([Book("The Casual Vacancy", "J. K. Rowling"), Book("Emma", "Jane Austen")])
+    print("Catalog ids:", list(catalog.books))
+    library.add_user(User("Varun", 1))
+    library.add_user(User("Mitra", 2))
 
+    print(library.borrow_book(1, "ROW0001"))
+    print(library.borrow_book(2, "ROW0001"))
+    library.return_book(1, "ROW0001")
+    print(library.borrow_book(1, "ROW0001"))
+    print(library.borrow_book(2, "ROW0001"))
+    print("Users having ROW0001:", [u.name for u in library.users_with_book("ROW0001")])
+    print("Books issued to Mitra:", [b.title for b in library.books_of_user(2)])
@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from functools import lru_cache
+from string import Formatter
+import json
+import math
+import os
+import random
+import shutil
+import threading
+import time
 
 
 # -------------------- ENUM --------------------
@@ -23,6 +32,65 @@ class Notification:
         return self.message
 
 
+# -------------------- TEMPLATES --------------------
+class CompiledTemplate:
+    """A message template parsed once into a positional format string.
+
+    Named fields are resolved to positions at compile time, and renders are
+    memoised per tuple of field values and their types (1, 1.0 and True
+    compare equal but format differently), so identical variable sets are
+    formatted only once.
+    """
+
+    def __init__(self, source, cache_size=4096):
+        self.source = source
+        self.fields = []
+        pieces = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(source):
+            pieces.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field_name is None:
+                continue
+            if not field_name.isidentifier():
+                raise ValueError(f"Unsupported template field: {field_name!r}")
+            if field_name not in self.fields:
+                self.fields.append(field_name)
+            index = self.fields.index(field_name)
+            pieces.append("{" + str(index) + (f"!{conversion}" if conversion else "")
+                          + (f":{format_spec}" if format_spec else "") + "}")
+        self.fields = tuple(self.fields)
+        self.positional = "".join(pieces)
+        self._render_cached = lru_cache(maxsize=cache_size)(self._render)
+
+    def _render(self, values, types=None):
+        # types only takes part in the cache key
+        return self.positional.format(*values)
+
+    def render(self, variables):
+        values = tuple(variables[field] for field in self.fields)
+        try:
+            return self._render_cached(values, tuple(map(type, values)))
+        except TypeError:   # unhashable variable value, render without caching
+            return self._render(values)
+
+    def cache_info(self):
+        return self._render_cached.cache_info()
+
+
+class MessageTemplate:
+    def __init__(self, name, default_source, channel_sources=None):
+        self.name = name
+        self.default_source = default_source
+        self.channel_sources = channel_sources or {}
+        self.compiled = {}
+
+    def for_channel(self, channel_type: ChannelType) -> CompiledTemplate:
+        compiled = self.compiled.get(channel_type)
+        if compiled is None:
+            source = self.channel_sources.get(channel_type, self.default_source)
+            compiled = self.compiled[channel_type] = CompiledTemplate(source)
+        return compiled
+
+
 # -------------------- OBSERVER --------------------
 class Observer(ABC):
     @abstractmethod
@@ -77,6 +145,29 @@ class ChannelFactory:
             raise ValueError("Invalid Channel Type")
 
 
+# -------------------- CAMPAIGN --------------------
+class Campaign:
+    """Sends one template to a stream of recipients.
+
+    recipients is any iterable of (user_name, variables) pairs and is
+    consumed lazily, so a generator over millions of rows never has to be
+    materialised. Each message is rendered only when it is sent.
+    """
+
+    def __init__(self, template: MessageTemplate, channels):
+        # channels: ChannelType -> ChannelStrategy
+        self.routes = [(channel, template.for_channel(channel_type))
+                       for channel_type, channel in channels.items()]
+
+    def run(self, recipients):
+        sent = 0
+        for user_name, variables in recipients:
+            for channel, compiled in self.routes:
+                channel.send_notification(Notification(user_name, compiled.render(variables)))
+                sent += 1
+        return sent
+
+
 # -------------------- USER PREFERENCES --------------------
 class UserPreferences:
     def __init__(self):
@@ -105,8 +196,731 @@ class NotificationService:
             observer.update(notification)
 
 
+# -------------------- RETRY POLICY --------------------
+class DeliveryError(Exception):
+    pass
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=30.0, jitter=True):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def next_delay(self, attempt):
+        # Exponential backoff capped at max_delay, "full jitter" spreads retries
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+# -------------------- TIMER WHEEL --------------------
+class TimerWheel:
+    """Hashed timer wheel: O(1) schedule, one thread drives every retry."""
+
+    def __init__(self, tick=0.05, slots=512, clock=time.monotonic):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.clock = clock
+        self.cursor = 0
+        self.last_tick_time = clock()
+        self.pending = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def schedule(self, delay, callback):
+        ticks = max(1, math.ceil(delay / self.tick))
+        with self.lock:
+            rounds, offset = divmod(ticks, len(self.slots))
+            if offset == 0:
+                rounds, offset = rounds - 1, len(self.slots)
+            slot = (self.cursor + offset) % len(self.slots)
+            self.slots[slot].append([rounds, callback])
+            self.pending += 1
+
+    def advance(self, now=None):
+        now = self.clock() if now is None else now
+        due = []
+        with self.lock:
+            while self.last_tick_time + self.tick <= now:
+                self.last_tick_time += self.tick
+                self.cursor = (self.cursor + 1) % len(self.slots)
+                bucket = self.slots[self.cursor]
+                keep = []
+                for entry in bucket:
+                    if entry[0] == 0:
+                        due.append(entry[1])
+                    else:
+                        entry[0] -= 1
+                        keep.append(entry)
+                self.slots[self.cursor] = keep
+
+        try:
+            for callback in due:
+                # One failing callback must not kill the wheel thread or the
+                # callbacks queued behind it
+                try:
+                    callback()
+                except Exception as e:
+                    self.errors += 1
+                    print(f"TimerWheel callback failed: {e!r}")
+        finally:
+            with self.lock:
+                # Only decremented after callbacks ran, so a retry that reschedules
+                # itself never lets pending drop to zero in between
+                self.pending -= len(due)
+        return len(due)
+
+    def start(self):
+        if self._thread:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.tick):
+            self.advance()
+
+
+# -------------------- CIRCUIT BREAKER --------------------
+class CircuitState(Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=10.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        with self.lock:
+            if self.state == CircuitState.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                # Let exactly one probe through
+                self.state = CircuitState.HALF_OPEN
+                return True
+            return self.state == CircuitState.CLOSED
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.state = CircuitState.CLOSED
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CircuitState.OPEN
+                self.opened_at = self.clock()
+
+
+# -------------------- DEAD LETTER QUEUE --------------------
+class DeadLetterQueue:
+    """JSONL file of undeliverable notifications.
+
+    Records are buffered and written in batches of batch_size; with a
+    timer_wheel, a partial batch is flushed at most flush_interval seconds
+    after its first record. close() and read_all() flush as well.
+    """
+
+    def __init__(self, path, batch_size=512, flush_interval=0.5, timer_wheel=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timer_wheel = timer_wheel
+        self.lock = threading.Lock()
+        self.file = None
+        self.buffer = []
+        self.flush_scheduled = False
+
+    def push(self, channel_name, notification: Notification, attempts, error):
+        # Only a tuple is built here; JSON encoding happens once per batch
+        record = (channel_name, notification.user_name, notification.message,
+                  attempts, error, time.time())
+        schedule = False
+        with self.lock:
+            self.buffer.append(record)
+            if len(self.buffer) >= self.batch_size:
+                self._flush_locked()
+            elif self.timer_wheel and not self.flush_scheduled:
+                self.flush_scheduled = schedule = True
+        if schedule:
+            self.timer_wheel.schedule(self.flush_interval, self.flush)
+
+    @staticmethod
+    def _encode(record):
+        # Same output as json.dumps() of the record dict, without the dict
+        channel, user_name, message, attempts, error, failed_at = record
+        quote = json.encoder.encode_basestring_ascii
+        return (f'{{"channel": {quote(channel)}, "user_name": {quote(user_name)}, '
+                f'"message": {quote(message)}, "attempts": {attempts}, '
+                f'"error": {quote(str(error))}, "failed_at": {failed_at!r}}}\n')
+
+    def _flush_locked(self):
+        if not self.buffer:
+            return
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write("".join(map(self._encode, self.buffer)))
+        self.file.flush()
+        self.buffer.clear()
+
+    def flush(self):
+        with self.lock:
+            self.flush_scheduled = False
+            self._flush_locked()
+
+    def close(self):
+        with self.lock:
+            self._flush_locked()
+            if self.file:
+                self.file.close()
+                self.file = None
+
+    def read_all(self):
+        self.flush()
+        if not os.path.exists(self.path):
+            return []
+        with self.lock, open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def replay(self, channels):
+        """Re-deliver dead letters through channels (name -> observer).
+
+        Records whose channel is unknown, or whose delivery fails again, go
+        back on the queue. The snapshot is deleted only after every record
+        has been handled; one left by an interrupted replay is merged into
+        the next.
+        """
+        self.close()
+        tmp_path = self.path + ".replay"
+        with self.lock:
+            if os.path.exists(self.path):
+                if os.path.exists(tmp_path):
+                    with open(self.path, "rb") as src, open(tmp_path, "ab") as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, tmp_path)
+            elif not os.path.exists(tmp_path):
+                return 0
+
+        replayed = 0
+        with open(tmp_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        for record in records:
+            channel = channels.get(record["channel"])
+            notification = Notification(record["user_name"], record["message"])
+            if channel is None:
+                self.push(record["channel"], notification, record["attempts"], record["error"])
+                continue
+            try:
+                channel.update(notification)
+            except Exception as e:
+                self.push(record["channel"], notification, record["attempts"] + 1, e)
+                continue
+            replayed += 1
+        self.flush()
+        os.remove(tmp_path)
+        return replayed
+
+
+# -------------------- RELIABLE CHANNEL (DECORATOR) --------------------
+class ReliableChannel(ChannelStrategy):
+    """Wraps a channel with retries, a circuit breaker and a dead-letter queue.
+
+    Failures never propagate to NotificationService.notify; retries are
+    scheduled on a shared TimerWheel instead of sleeping.
+    """
+
+    def __init__(self, name, channel: ChannelStrategy, timer_wheel: TimerWheel,
+                 dead_letters: DeadLetterQueue, retry_policy=None, breaker=None):
+        self.name = name
+        self.channel = channel
+        self.timer_wheel = timer_wheel
+        self.dead_letters = dead_letters
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {"sent": 0, "failed_attempts": 0, "short_circuited": 0, "dead_lettered": 0}
+        self.circuit_open_error = DeliveryError(f"{name} circuit open")
+
+    def send_notification(self, notification: Notification):
+        self._attempt(notification, 1)
+
+    def _attempt(self, notification, attempt):
+        if not self.breaker.allow_request():
+            # Retrying against an open circuit only burns timer-wheel work;
+            # dead-letter now and let replay() redeliver once it recovers
+            self.stats["short_circuited"] += 1
+            self._dead_letter(notification, attempt, self.circuit_open_error)
+            return
+
+        try:
+            self.channel.send_notification(notification)
+        except Exception as e:
+            self.breaker.record_failure()
+            self.stats["failed_attempts"] += 1
+            self._on_failure(notification, attempt, e)
+            return
+
+        self.breaker.record_success()
+        self.stats["sent"] += 1
+
+    def _dead_letter(self, notification, attempt, error):
+        self.dead_letters.push(self.name, notification, attempt, error)
+        self.stats["dead_lettered"] += 1
+
+    def _on_failure(self, notification, attempt, error):
+        if attempt >= self.retry_policy.max_attempts:
+            self._dead_letter(notification, attempt, error)
+            return
+        delay = self.retry_policy.next_delay(attempt)
+        self.timer_wheel.schedule(delay, lambda: self._attempt(notification, attempt + 1))
+
+
+# -------------------- COALESCING CHANNEL (DECORATOR) --------------------
+class CoalescingChannel(ChannelStrategy):
+    """Drops duplicates, merges bursts into digests and rate-limits a channel.
+
+    - Exact duplicates (same user and message) inside dedup_window are
+      dropped; the seen-set is an insertion-ordered dict capped at
+      max_tracked hashes, so memory stays bounded.
+    - Messages for the same user are buffered for digest_window seconds
+      and sent as one digest.
+    - Sends go through a token bucket of rate_per_sec; a user whose digest
+      cannot be sent yet stays buffered and keeps absorbing updates, up to
+      max_digest_messages. Further updates are only counted ("+N more").
+    - A failing send is dead-lettered (or logged) instead of raising on the
+      timer-wheel thread.
+    """
+
+    def __init__(self, channel: ChannelStrategy, timer_wheel: TimerWheel, dedup_window=60.0,
+                 digest_window=5.0, rate_per_sec=50.0, burst=None, max_tracked=100000,
+                 max_digest_messages=50, dead_letters=None, clock=time.monotonic):
+        self.channel = channel
+        self.timer_wheel = timer_wheel
+        self.dedup_window = dedup_window
+        self.digest_window = digest_window
+        self.rate_per_sec = rate_per_sec
+        self.capacity = burst or rate_per_sec
+        self.max_tracked = max_tracked
+        self.max_digest_messages = max_digest_messages
+        self.dead_letters = dead_letters
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.seen = {}      # hash(user, message) -> first seen time, oldest first
+        self.buffers = {}   # user -> [messages], at most max_digest_messages
+        self.overflow = {}  # user -> updates beyond max_digest_messages
+        self.tokens = self.capacity
+        self.last_refill = clock()
+        self.stats = {"received": 0, "duplicates_dropped": 0, "merged": 0,
+                      "overflowed": 0, "rate_limited": 0, "channel_calls": 0, "send_failures": 0}
+
+    def channel_calls_saved(self):
+        return self.stats["received"] - self.stats["channel_calls"] - self.pending_messages()
+
+    def pending_messages(self):
+        with self.lock:
+            return (sum(len(messages) for messages in self.buffers.values())
+                    + sum(self.overflow.values()))
+
+    def send_notification(self, notification: Notification):
+        now = self.clock()
+        key = hash((notification.user_name, notification.message))
+        with self.lock:
+            self.stats["received"] += 1
+            self._expire_seen(now)
+            if key in self.seen:
+                self.stats["duplicates_dropped"] += 1
+                return
+            self.seen[key] = now
+
+            messages = self.buffers.get(notification.user_name)
+            if messages is not None:
+                self.stats["merged"] += 1
+                if len(messages) < self.max_digest_messages:
+                    messages.append(notification.message)
+                else:
+                    self.overflow[notification.user_name] = self.overflow.get(notification.user_name, 0) + 1
+                    self.stats["overflowed"] += 1
+                return
+            self.buffers[notification.user_name] = [notification.message]
+
+        user_name = notification.user_name
+        self.timer_wheel.schedule(self.digest_window, lambda: self.flush(user_name))
+
+    def _expire_seen(self, now):
+        # dicts keep insertion order, so the oldest hashes are at the front
+        while self.seen:
+            oldest_key = next(iter(self.seen))
+            if now - self.seen[oldest_key] < self.dedup_window and len(self.seen) < self.max_tracked:
+                break
+            del self.seen[oldest_key]
+
+    def _take_token(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate_per_sec)
+        self.last_refill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def flush(self, user_name):
+        with self.lock:
+            if user_name not in self.buffers:
+                return
+            if not self._take_token(self.clock()):
+                self.stats["rate_limited"] += 1
+                retry_in = (1 - self.tokens) / self.rate_per_sec
+                self.timer_wheel.schedule(retry_in, lambda: self.flush(user_name))
+                return
+            messages = self.buffers.pop(user_name)
+            extra = self.overflow.pop(user_name, 0)
+            self.stats["channel_calls"] += 1
+
+        self._send(self._digest(user_name, messages, extra))
+
+    def flush_all(self):
+        """Send every buffered digest now, ignoring the rate limit."""
+        with self.lock:
+            buffers, self.buffers = self.buffers, {}
+            overflow, self.overflow = self.overflow, {}
+            self.stats["channel_calls"] += len(buffers)
+        for user_name, messages in buffers.items():
+            self._send(self._digest(user_name, messages, overflow.get(user_name, 0)))
+
+    def _send(self, notification):
+        try:
+            self.channel.send_notification(notification)
+        except Exception as e:
+            with self.lock:
+                self.stats["send_failures"] += 1
+            if self.dead_letters:
+                self.dead_letters.push(type(self.channel).__name__, notification, 1, e)
+            else:
+                print(f"CoalescingChannel send failed for {notification.user_name}: {e!r}")
+
+    @staticmethod
+    def _digest(user_name, messages, extra=0):
+        if len(messages) == 1 and not extra:
+            return Notification(user_name, messages[0])
+        text = f"{len(messages) + extra} updates: " + " | ".join(messages)
+        if extra:
+            text += f" | +{extra} more"
+        return Notification(user_name, text)
+
+
+# -------------------- DURABLE OUTBOX --------------------
+class OutboxLog:
+    """Append-only, segment-rotated write-ahead log of outgoing notifications.
+
+    Enqueue records are fsynced in group commits: writers block until a
+    background flusher has synced the batch that contains their record.
+    Ack records are not synced on their own; a lost ack only causes a
+    redelivery after a crash, never a lost notification.
+    """
+
+    SEGMENT_PREFIX = "segment-"
+
+    def __init__(self, directory, segment_max_records=10000, commit_interval=0.0, group_commit=True):
+        self.directory = directory
+        self.segment_max_records = segment_max_records
+        self.commit_interval = commit_interval
+        self.group_commit = group_commit
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.committed = threading.Condition(self.lock)
+        self.has_writes = threading.Condition(self.lock)
+        self.next_id = 1
+        self.written_id = 0
+        self.durable_id = 0
+        self.pending = {}             # entry id -> (segment no, Notification)
+        self.unacked_by_segment = {}  # segment no -> number of unacked entries
+        self.file = None
+        self.segment_no = 0
+        self.segment_records = 0
+        self.closed = False
+
+        self._load()
+        self._rotate()
+        self._flusher = None
+        if group_commit:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    # ---- recovery ----
+    def _segment_path(self, segment_no):
+        return os.path.join(self.directory, f"{self.SEGMENT_PREFIX}{segment_no:08d}.log")
+
+    def _segments(self):
+        names = [n for n in os.listdir(self.directory) if n.startswith(self.SEGMENT_PREFIX)]
+        return sorted(int(n[len(self.SEGMENT_PREFIX):-4]) for n in names)
+
+    def _load(self):
+        for segment_no in self._segments():
+            self.segment_no = segment_no
+            self.unacked_by_segment.setdefault(segment_no, 0)
+            with open(self._segment_path(segment_no), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn write at the tail of the last segment
+                    entry_id = record["id"]
+                    if record["op"] == "enqueue":
+                        notification = Notification(record["user_name"], record["message"])
+                        self.pending[entry_id] = (segment_no, notification)
+                        self.unacked_by_segment[segment_no] += 1
+                        self.next_id = max(self.next_id, entry_id + 1)
+                    elif entry_id in self.pending:
+                        acked_segment, _ = self.pending.pop(entry_id)
+                        self.unacked_by_segment[acked_segment] -= 1
+        self.written_id = self.durable_id = self.next_id - 1
+
+    def undelivered(self):
+        with self.lock:
+            return sorted((entry_id, n) for entry_id, (_, n) in self.pending.items())
+
+    # ---- writes ----
+    def _rotate(self):
+        if self.file:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+        self.segment_no += 1
+        self.segment_records = 0
+        self.unacked_by_segment[self.segment_no] = 0
+        self.file = open(self._segment_path(self.segment_no), "a", encoding="utf-8")
+
+    def _write(self, record):
+        if self.segment_records >= self.segment_max_records:
+            self._rotate()
+        self.file.write(json.dumps(record) + "\n")
+        self.segment_records += 1
+
+    def append(self, notification: Notification):
+        with self.lock:
+            entry_id = self.next_id
+            self.next_id += 1
+            self._write({"op": "enqueue", "id": entry_id,
+                         "user_name": notification.user_name, "message": notification.message})
+            self.pending[entry_id] = (self.segment_no, notification)
+            self.unacked_by_segment[self.segment_no] += 1
+            self.written_id = entry_id
+
+            if not self.group_commit:
+                self._sync_locked()
+            else:
+                self.has_writes.notify()
+                while self.durable_id < entry_id and not self.closed:
+                    self.committed.wait()
+        return entry_id
+
+    def ack(self, entry_id):
+        with self.lock:
+            if entry_id not in self.pending:
+                return
+            segment_no, _ = self.pending.pop(entry_id)
+            self.unacked_by_segment[segment_no] -= 1
+            self._write({"op": "ack", "id": entry_id})
+
+    def _sync_locked(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.durable_id = self.written_id
+        self.committed.notify_all()
+
+    def _flush_loop(self):
+        # Whatever accumulates while the previous fsync runs becomes the next
+        # group; commit_interval optionally widens the batching window.
+        while True:
+            with self.lock:
+                while self.durable_id >= self.written_id and not self.closed:
+                    self.has_writes.wait()
+                if self.closed:
+                    return
+            if self.commit_interval:
+                time.sleep(self.commit_interval)
+            with self.lock:
+                target = self.written_id
+                self.file.flush()
+                fd = os.dup(self.file.fileno())
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            with self.lock:
+                self.durable_id = max(self.durable_id, target)
+                self.committed.notify_all()
+
+    # ---- compaction ----
+    def compact(self):
+        """Delete the oldest segments whose entries are all acknowledged.
+
+        Only a prefix of segments is removed, so an ack record can never
+        outlive the segment holding the entry it acknowledges.
+        """
+        removed = 0
+        with self.lock:
+            for segment_no in sorted(self.unacked_by_segment):
+                if segment_no == self.segment_no or self.unacked_by_segment[segment_no] > 0:
+                    break
+                os.remove(self._segment_path(segment_no))
+                del self.unacked_by_segment[segment_no]
+                removed += 1
+        return removed
+
+    def close(self):
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.durable_id = self.written_id
+            self.closed = True
+            self.committed.notify_all()
+            self.has_writes.notify_all()
+            self.file.close()
+        if self._flusher:
+            self._flusher.join()
+
+
+class DurableNotificationService(NotificationService):
+    def __init__(self, outbox: OutboxLog):
+        super().__init__()
+        self.outbox = outbox
+
+    def notify(self, notification: Notification):
+        entry_id = self.outbox.append(notification)
+        super().notify(notification)
+        self.outbox.ack(entry_id)
+
+    def recover(self):
+        """Replay entries that were enqueued but never acknowledged."""
+        replayed = 0
+        for entry_id, notification in self.outbox.undelivered():
+            super().notify(notification)
+            self.outbox.ack(entry_id)
+            replayed += 1
+        self.outbox.compact()
+        return replayed
+
+
+# -------------------- FAULT INJECTION BENCHMARK --------------------
+class StubChannel(ChannelStrategy):
+    def __init__(self, failure_rate=0.0, latency=0.0):
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.delivered = 0
+
+    def send_notification(self, notification: Notification):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise DeliveryError("injected failure")
+        self.delivered += 1
+
+
+def benchmark_fault_injection(messages=100_000, down_channel_failure_rate=1.0, dlq_path="notification_dlq.jsonl"):
+    if os.path.exists(dlq_path):
+        os.remove(dlq_path)
+
+    results = {}
+    for label, failure_rate in (("healthy", 0.0), ("one_channel_down", down_channel_failure_rate)):
+        wheel = TimerWheel(tick=0.01)
+        dead_letters = DeadLetterQueue(dlq_path, timer_wheel=wheel)
+        service = NotificationService()
+        channels = {
+            "EMAIL": ReliableChannel("EMAIL", StubChannel(), wheel, dead_letters),
+            "PUSH": ReliableChannel("PUSH", StubChannel(), wheel, dead_letters),
+            "SMS": ReliableChannel(
+                "SMS", StubChannel(failure_rate=failure_rate), wheel, dead_letters,
+                retry_policy=RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05),
+                breaker=CircuitBreaker(failure_threshold=5, reset_timeout=0.05),
+            ),
+        }
+        for channel in channels.values():
+            service.attach(channel)
+
+        wheel.start()
+        start = time.perf_counter()
+        for i in range(messages):
+            service.notify(Notification(f"user{i % 1000}", "Your order has been shipped"))
+        elapsed = time.perf_counter() - start
+
+        # Drain outstanding retries so every message is either sent or dead-lettered
+        while wheel.pending:
+            time.sleep(wheel.tick)
+        wheel.stop()
+        dead_letters.close()
+
+        results[label] = {
+            "notify_per_sec": round(messages / elapsed),
+            "channels": {name: dict(channel.stats) for name, channel in channels.items()},
+        }
+
+    for label, result in results.items():
+        print(f"{label:>18}: {result['notify_per_sec']:>8} notify/s  {result['channels']['SMS']}")
+    if os.path.exists(dlq_path):
+        os.remove(dlq_path)
+    return results
+
+
+def benchmark_outbox(messages=2000, producers=16, directory="notification_outbox_bench"):
+    import shutil
+
+    results = {}
+    for label, group_commit in (("sync_per_message", False), ("group_commit", True)):
+        shutil.rmtree(directory, ignore_errors=True)
+        outbox = OutboxLog(directory, group_commit=group_commit)
+        per_thread = messages // producers
+
+        def produce():
+            for i in range(per_thread):
+                outbox.append(Notification(f"user{i}", "Your order has been shipped"))
+
+        threads = [threading.Thread(target=produce) for _ in range(producers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        outbox.close()
+        results[label] = round(per_thread * producers / elapsed)
+        print(f"{label:>18}: {results[label]:>8} durable enqueues/s")
+
+    shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
 # -------------------- CLIENT --------------------
 if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        benchmark_fault_injection()
+        benchmark_outbox()
+        sys.exit()
 
     # User preferences
     user_preferences = UserPreferences()
@@ -129,3 +943,17 @@ if __name__ == "__main__":
 
     # Notify all observers
     service.notify(notification)
+
+    # Campaign: template compiled once per channel, recipients streamed
+    template = MessageTemplate(
+        "order_shipped",
+        "Hi {name}, your order {order_id} has been shipped",
+        {ChannelType.SMS: "Order {order_id} shipped"},
+    )
+    recipients = ((user, {"name": user, "order_id": f"#{i:04d}"})
+                  for i, user in enumerate(["Varun", "Mitra"]))
+    campaign = Campaign(template, {
+        ChannelType.EMAIL: ChannelFactory.get_channel(ChannelType.EMAIL),
+        ChannelType.SMS: ChannelFactory.get_channel(ChannelType.SMS),
+    })
+    campaign.run(recipients)
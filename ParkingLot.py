@@ -1,7 +1,20 @@
+from contextlib import nullcontext
 from enum import Enum
+import heapq
+import itertools
+import math
+import os
+import random
+import struct
+import threading
 import time
 import uuid
 
+try:
+    import numpy as np
+except ImportError:   # the simulator then samples one value at a time
+    np = None
+
 # ---------------- ENUMS ----------------
 
 class VehicleType(Enum):
@@ -20,10 +33,17 @@ class SpotStatus(Enum):
 
 # ---------------- VEHICLE ----------------
 
+# Number of adjacent LARGE spots a vehicle occupies when it needs more than one
+SPOTS_NEEDED = {
+    VehicleType.BUS: 2,
+}
+
 class Vehicle:
-    def __init__(self, number, vehicle_type):
+    def __init__(self, number, vehicle_type, spots_needed=None):
         self.number = number
         self.type = vehicle_type
+        self.type_value = vehicle_type.value   # int key for hot-path lookups
+        self.spots_needed = spots_needed or SPOTS_NEEDED.get(vehicle_type, 1)
 
 # ---------------- PARKING SPOT ----------------
 
@@ -31,6 +51,7 @@ class ParkingSpot:
     def __init__(self, spot_id, size):
         self.spot_id = spot_id
         self.size = size
+        self.size_value = size.value
         self.status = SpotStatus.FREE
 
     def can_fit(self, vehicle):
@@ -43,70 +64,619 @@ class ParkingSpot:
 
 # ---------------- PARKING FLOOR ----------------
 
-def find_spots(self, vehicle):
-    if vehicle.type != VehicleType.BUS:
-        return next(
-            ([s] for s in self.spots if s.status == SpotStatus.FREE and s.can_fit(vehicle)),
-            None
+# Spot sizes each vehicle type fits in
+FITTING_SIZES = {
+    VehicleType.MOTORCYCLE: (SpotSize.SMALL, SpotSize.MEDIUM, SpotSize.LARGE),
+    VehicleType.CAR: (SpotSize.MEDIUM, SpotSize.LARGE),
+    VehicleType.BUS: (SpotSize.LARGE,),
+}
+# Same table keyed by int values: Enum.__hash__ runs in Python and showed
+# up as the top cost of allocation
+FITTING_SIZE_VALUES = {t.value: tuple(s.value for s in sizes) for t, sizes in FITTING_SIZES.items()}
+
+class FreeRunTree:
+    """Segment tree over spot positions marking free LARGE spots.
+
+    Each node keeps the longest free prefix, suffix and inner run of its
+    range, so the leftmost run of length >= k is found in O(log n).
+    Parks and exits only record their change in O(1); find_first applies
+    the recorded changes in one bottom-up pass before searching.
+    """
+
+    def __init__(self, free_flags):
+        self.n = len(free_flags)
+        size = 1
+        while size < max(1, self.n):
+            size *= 2
+        self.size = size
+        self.length = [0] * (2 * size)
+        self.pref = [0] * (2 * size)
+        self.suf = [0] * (2 * size)
+        self.best = [0] * (2 * size)
+        self.pending = {}   # position -> free, not yet applied to the tree
+        for i in range(size):
+            self.length[size + i] = 1
+            if i < self.n and free_flags[i]:
+                self.pref[size + i] = self.suf[size + i] = self.best[size + i] = 1
+        for node in range(size - 1, 0, -1):
+            self.length[node] = 2 * self.length[2 * node]
+            self._pull(node)
+
+    def _pull(self, node):
+        left, right = 2 * node, 2 * node + 1
+        half = self.length[left]
+        self.pref[node] = self.pref[left] + (self.pref[right] if self.pref[left] == half else 0)
+        self.suf[node] = self.suf[right] + (self.suf[left] if self.suf[right] == half else 0)
+        self.best[node] = max(self.best[left], self.best[right], self.suf[left] + self.pref[right])
+
+    def set_free(self, position, free):
+        # Only recorded here: every LARGE park and exit lands in this method,
+        # while multi-spot vehicles (the only readers) are rare
+        self.pending[position] = free
+
+    def _apply_pending(self):
+        # Apply all recorded changes, then recompute their ancestors one
+        # level at a time, so shared ancestors are pulled once per batch
+        pref, suf, best, length = self.pref, self.suf, self.best, self.length
+        parents = set()
+        for position, free in self.pending.items():
+            node = self.size + position
+            value = 1 if free else 0
+            if best[node] != value:
+                pref[node] = suf[node] = best[node] = value
+                if node > 1:
+                    parents.add(node >> 1)
+        self.pending.clear()
+        while parents:
+            changed = set()
+            for node in parents:
+                left = 2 * node
+                right = left + 1
+                half = length[left]
+                new_pref = pref[left] + (pref[right] if pref[left] == half else 0)
+                new_suf = suf[right] + (suf[left] if suf[right] == half else 0)
+                new_best = suf[left] + pref[right]
+                if best[left] > new_best:
+                    new_best = best[left]
+                if best[right] > new_best:
+                    new_best = best[right]
+                if pref[node] != new_pref or suf[node] != new_suf or best[node] != new_best:
+                    pref[node], suf[node], best[node] = new_pref, new_suf, new_best
+                    if node > 1:
+                        changed.add(node >> 1)   # nothing above an unchanged node can change
+            parents = changed
+
+    def find_first(self, k):
+        """Start position of the leftmost free run of length >= k, or None."""
+        if self.pending:
+            self._apply_pending()
+        if k < 1 or self.best[1] < k:
+            return None
+        node, start = 1, 0
+        while node < self.size:
+            left, right = 2 * node, 2 * node + 1
+            half = self.length[left]
+            if self.best[left] >= k:
+                node = left
+            elif self.suf[left] + self.pref[right] >= k:
+                return start + half - self.suf[left]
+            else:
+                node, start = right, start + half
+        return start
+
+class ParkingFloor:
+    def __init__(self, floor_id, spots):
+        self.floor_id = floor_id
+        self.spots = spots
+        # Replaced by a real lock when the floor joins a thread-safe ParkingLot
+        self.lock = nullcontext()
+        # Per-size min-heaps of (spot_id, position) over free spots, plus
+        # running counters, both indexed by SpotSize value. Entries are
+        # removed lazily: a heap top that is no longer FREE is discarded on
+        # the next lookup.
+        self.free_heaps = [[] for _ in range(len(SpotSize) + 1)]
+        self.in_heap = set()
+        self.free_by_size = [0] * (len(SpotSize) + 1)
+        self.free_count = 0
+        for position, spot in enumerate(spots):
+            if spot.status == SpotStatus.FREE:
+                self._push_free(position, spot)
+                self.free_by_size[spot.size_value] += 1
+                self.free_count += 1
+        for heap in self.free_heaps:
+            heapq.heapify(heap)
+        self.position_of = {id(spot): position for position, spot in enumerate(spots)}
+        self.large_runs = FreeRunTree(
+            [s.size == SpotSize.LARGE and s.status == SpotStatus.FREE for s in spots]
         )
 
-    prev = None
-    for s in self.spots:
-        if s.status == SpotStatus.FREE and s.size == SpotSize.LARGE:
-            if prev:
-                return [prev, s]
-            prev = s
-        else:
-            prev = None
-    return None
+    def _push_free(self, position, spot):
+        if position not in self.in_heap:
+            self.in_heap.add(position)
+            self.free_heaps[spot.size_value].append((spot.spot_id, position))
+
+    def _top(self, size):
+        heap = self.free_heaps[size]
+        while heap and self.spots[heap[0][1]].status != SpotStatus.FREE:
+            self.in_heap.discard(heapq.heappop(heap)[1])
+        return heap[0] if heap else None
+
+    def can_park(self, vehicle):
+        free_by_size = self.free_by_size
+        for size in FITTING_SIZE_VALUES[vehicle.type_value]:
+            if free_by_size[size]:
+                return True
+        return False
+
+    def find_spots(self, vehicle):
+        if not self.can_park(vehicle):
+            return None
+        return self._find_spots(vehicle)
+
+    def _find_spots(self, vehicle):
+        if vehicle.spots_needed == 1:
+            # Lowest spot ID among the fitting sizes, as the old linear scan returned
+            best = None
+            free_by_size = self.free_by_size
+            for size in FITTING_SIZE_VALUES[vehicle.type_value]:
+                if free_by_size[size]:
+                    top = self._top(size)
+                    if top and (best is None or top < best):
+                        best = top
+            return [self.spots[best[1]]] if best else None
+
+        # Multi-spot vehicles need adjacent free LARGE spots
+        start = self.large_runs.find_first(vehicle.spots_needed)
+        if start is None:
+            return None
+        return self.spots[start:start + vehicle.spots_needed]
+
+    def reserve(self, vehicle):
+        """Find and occupy spots for vehicle atomically, all or nothing."""
+        if not self.can_park(vehicle):   # lock-free early out, rechecked below
+            return None
+        return self._reserve(vehicle)
+
+    def _reserve(self, vehicle):
+        # reserve() for callers that already did the lock-free early out
+        with self.lock:
+            spots = self._find_spots(vehicle)
+            if spots:
+                self.occupy(spots)
+            return spots
+
+    def occupy(self, spots):
+        for spot in spots:
+            spot.status = SpotStatus.OCCUPIED
+            self.free_by_size[spot.size_value] -= 1
+            self.free_count -= 1
+            if spot.size == SpotSize.LARGE:
+                self.large_runs.set_free(self.position_of[id(spot)], False)
+
+    def release(self, spots):
+        for spot in spots:
+            # Counted before it is marked FREE, so a lock-free can_park may
+            # see a spot early but never misses a free one
+            self.free_by_size[spot.size_value] += 1
+            self.free_count += 1
+            spot.status = SpotStatus.FREE
+            position = self.position_of[id(spot)]
+            if spot.size == SpotSize.LARGE:
+                self.large_runs.set_free(position, True)
+            if position not in self.in_heap:
+                self.in_heap.add(position)
+                heapq.heappush(self.free_heaps[spot.size_value], (spot.spot_id, position))
 
 # ---------------- TICKET ----------------
 
 class ParkingTicket:
-    def __init__(self, vehicle, spots):
-        self.ticket_id = str(uuid.uuid4())
+    def __init__(self, vehicle, spots, floor=None, clock=time.time, ticket_id=None):
+        self.ticket_id = ticket_id or str(uuid.uuid4())
         self.vehicle = vehicle
         self.spots = spots
-        self.entry_time = time.time()
+        self.floor = floor
+        self.clock = clock
+        self.entry_time = clock()
         self.exit_time = None
 
     def close(self):
-        self.exit_time = time.time()
+        self.exit_time = self.clock()
+
+    # Hourly rate by VehicleType value; built once rather than per fee,
+    # and keyed by int because Enum hashing runs in Python
+    RATES = {
+        VehicleType.MOTORCYCLE.value: 10,
+        VehicleType.CAR.value: 20,
+        VehicleType.BUS.value: 50
+    }
 
     def calculate_fee(self):
         hours = int((self.exit_time - self.entry_time) / 3600) + 1
-        rates = {
-            VehicleType.MOTORCYCLE: 10,
-            VehicleType.CAR: 20,
-            VehicleType.BUS: 50
-        }
-        return hours * rates[self.vehicle.type]
+        return hours * self.RATES[self.vehicle.type_value]
+
+# ---------------- TICKET LEDGER ----------------
+
+class TicketEvent(Enum):
+    ENTRY = 1
+    EXIT = 2
+
+class LedgerAggregates:
+    """Running totals updated in O(1) per ledger event."""
+
+    def __init__(self):
+        self.revenue_by_hour = {}       # epoch hour -> revenue
+        self.entries_by_hour = {}       # epoch hour -> entries
+        self.occupancy_by_floor = {}    # floor_id -> parked vehicles
+        self.occupancy_by_type = {t: 0 for t in VehicleType}
+        self.total_revenue = 0
+
+    def apply_entry(self, timestamp, floor_id, vehicle_type):
+        hour = int(timestamp // 3600)
+        self.entries_by_hour[hour] = self.entries_by_hour.get(hour, 0) + 1
+        self.occupancy_by_floor[floor_id] = self.occupancy_by_floor.get(floor_id, 0) + 1
+        self.occupancy_by_type[vehicle_type] += 1
+
+    def apply_exit(self, timestamp, floor_id, vehicle_type, fee):
+        hour = int(timestamp // 3600)
+        self.revenue_by_hour[hour] = self.revenue_by_hour.get(hour, 0) + fee
+        self.occupancy_by_floor[floor_id] -= 1
+        self.occupancy_by_type[vehicle_type] -= 1
+        self.total_revenue += fee
+
+class TicketLedger:
+    """Append-only binary log of ticket entry/exit events.
+
+    Entry: header, floor_id, vehicle type, spot positions, vehicle number.
+    Exit:  header, fee.
+    The header is (event, ticket UUID bytes, timestamp), so a record is a
+    few dozen bytes instead of a pickled ticket.
+
+    Every record reaches the OS before the ticket is handed out (the file
+    is unbuffered); sync=True also fsyncs it, surviving power loss.
+    On replay an unknown event code or undecodable entry ends the log (the
+    file is truncated there), and an exit without an entry is skipped.
+    """
+
+    HEADER = struct.Struct("<B16sd")
+    ENTRY = struct.Struct("<iBBB")   # floor_id, vehicle type, spot count, number length
+    EXIT = struct.Struct("<d")       # fee
+
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.sync = sync
+        self.lock = threading.Lock()
+        self.aggregates = LedgerAggregates()
+        self.open_entries = {}   # ticket_id -> (timestamp, floor_id, vehicle type, positions, number)
+        self.skipped = 0         # records ignored during replay
+        self._replay()
+        self.file = open(path, "ab", buffering=0)
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset + self.HEADER.size <= len(data):
+            event, ticket_bytes, timestamp = self.HEADER.unpack_from(data, offset)
+            body = offset + self.HEADER.size
+            ticket_id = str(uuid.UUID(bytes=ticket_bytes))
+            if event == TicketEvent.ENTRY.value:
+                if body + self.ENTRY.size > len(data):
+                    break
+                floor_id, vehicle_type, count, number_len = self.ENTRY.unpack_from(data, body)
+                body += self.ENTRY.size
+                end = body + 4 * count + number_len
+                if end > len(data):
+                    break   # torn tail write
+                try:
+                    vehicle_type = VehicleType(vehicle_type)
+                    number = data[body + 4 * count:end].decode()
+                except (ValueError, UnicodeDecodeError):
+                    break   # corrupt record, nothing after it can be trusted
+                positions = struct.unpack_from(f"<{count}I", data, body)
+                self._apply_entry(ticket_id, timestamp, floor_id, vehicle_type, positions, number)
+            elif event == TicketEvent.EXIT.value:
+                end = body + self.EXIT.size
+                if end > len(data):
+                    break
+                (fee,) = self.EXIT.unpack_from(data, body)
+                if ticket_id in self.open_entries:
+                    self._apply_exit(ticket_id, timestamp, fee)
+                else:
+                    self.skipped += 1
+            else:
+                break   # unknown event code: record boundaries are lost
+            offset = end
+        if offset < len(data):
+            print(f"TicketLedger: dropping {len(data) - offset} bytes of torn or corrupt records")
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def _apply_entry(self, ticket_id, timestamp, floor_id, vehicle_type, positions, number):
+        self.open_entries[ticket_id] = (timestamp, floor_id, vehicle_type, positions, number)
+        self.aggregates.apply_entry(timestamp, floor_id, vehicle_type)
+
+    def _apply_exit(self, ticket_id, timestamp, fee):
+        _, floor_id, vehicle_type, _, _ = self.open_entries.pop(ticket_id)
+        self.aggregates.apply_exit(timestamp, floor_id, vehicle_type, fee)
+
+    def record_entry(self, ticket):
+        positions = [ticket.floor.position_of[id(spot)] for spot in ticket.spots]
+        number = ticket.vehicle.number.encode()
+        record = (
+            self.HEADER.pack(TicketEvent.ENTRY.value, uuid.UUID(ticket.ticket_id).bytes, ticket.entry_time)
+            + self.ENTRY.pack(ticket.floor.floor_id, ticket.vehicle.type.value, len(positions), len(number))
+            + struct.pack(f"<{len(positions)}I", *positions)
+            + number
+        )
+        with self.lock:
+            self._write(record)
+            self._apply_entry(ticket.ticket_id, ticket.entry_time, ticket.floor.floor_id,
+                              ticket.vehicle.type, positions, ticket.vehicle.number)
+
+    def record_exit(self, ticket, fee):
+        record = (
+            self.HEADER.pack(TicketEvent.EXIT.value, uuid.UUID(ticket.ticket_id).bytes, ticket.exit_time)
+            + self.EXIT.pack(fee)
+        )
+        with self.lock:
+            self._write(record)
+            self._apply_exit(ticket.ticket_id, ticket.exit_time, fee)
+
+    def _write(self, record):
+        self.file.write(record)
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+    def flush(self):
+        with self.lock:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            self.file.close()
 
 # ---------------- PARKING LOT ----------------
 
 class ParkingLot:
-    def __init__(self, floors):
+    def __init__(self, floors, thread_safe=False, ledger=None, clock=time.time, verbose=True):
         self.floors = floors
         self.active_tickets = {}
+        self.thread_safe = thread_safe
+        self.ledger = ledger
+        self.clock = clock
+        self.verbose = verbose
+        # Optional () -> ticket id; tickets get a uuid4 when None
+        self.ticket_ids = None
+        # Each floor gets its own lock so gates parking on different floors
+        # never contend; the ticket map and the lot-wide counts below share
+        # a separate short-lived lock.
+        self.tickets_lock = threading.Lock() if thread_safe else nullcontext()
+        if thread_safe:
+            for floor in floors:
+                floor.lock = threading.Lock()
+        if ledger:
+            self._restore_from_ledger()
+        # Lot-wide free spots per SpotSize value, so a full lot rejects
+        # without visiting every floor. They never undercount: a park
+        # subtracts only after its floor reserved the spots, and an exit
+        # adds before its floor frees them. A zero read without the lock
+        # therefore means no fitting spot is free.
+        self.free_by_size = [0] * (len(SpotSize) + 1)
+        for floor in floors:
+            for size, free in enumerate(floor.free_by_size):
+                self.free_by_size[size] += free
+
+    def _restore_from_ledger(self):
+        # Tickets still open in the ledger re-occupy their spots
+        floors_by_id = {floor.floor_id: floor for floor in self.floors}
+        for ticket_id, (entry_time, floor_id, vehicle_type, positions, number) in self.ledger.open_entries.items():
+            floor = floors_by_id[floor_id]
+            spots = [floor.spots[p] for p in positions]
+            floor.occupy(spots)
+            ticket = ParkingTicket(Vehicle(number, vehicle_type, len(spots)), spots, floor, self.clock)
+            ticket.ticket_id = ticket_id
+            ticket.entry_time = entry_time
+            self.active_tickets[ticket_id] = ticket
 
     def park_vehicle(self, vehicle):
+        sizes = FITTING_SIZE_VALUES[vehicle.type_value]
+        free_by_size = self.free_by_size
+        for size in sizes:
+            if free_by_size[size]:
+                break
+        else:
+            if self.verbose:
+                print("No spot available")
+            return None
+
         for floor in self.floors:
-            spots = floor.find_spots(vehicle)
+            # ParkingFloor.reserve's lock-free early out, inlined: most
+            # floors of a busy lot are skipped here
+            floor_free = floor.free_by_size
+            for size in sizes:
+                if floor_free[size]:
+                    break
+            else:
+                continue
+            spots = floor._reserve(vehicle)
             if spots:
-                for spot in spots:
-                    spot.status = SpotStatus.OCCUPIED
-                ticket = ParkingTicket(vehicle, spots)
-                self.active_tickets[ticket.ticket_id] = ticket
+                ticket_id = self.ticket_ids() if self.ticket_ids else None
+                ticket = ParkingTicket(vehicle, spots, floor, self.clock, ticket_id)
+                with self.tickets_lock:
+                    for spot in spots:
+                        free_by_size[spot.size_value] -= 1
+                    self.active_tickets[ticket.ticket_id] = ticket
+                if self.ledger:
+                    self.ledger.record_entry(ticket)
                 return ticket
-        print("No spot available")
+        if self.verbose:
+            print("No spot available")
         return None
 
     def exit_vehicle(self, ticket_id):
-        ticket = self.active_tickets.pop(ticket_id)
+        with self.tickets_lock:
+            ticket = self.active_tickets.pop(ticket_id)
+            for spot in ticket.spots:   # before the floor frees them, see __init__
+                self.free_by_size[spot.size_value] += 1
         ticket.close()
-        for spot in ticket.spots:
-            spot.status = SpotStatus.FREE
-        return ticket.calculate_fee()
+        with ticket.floor.lock:
+            ticket.floor.release(ticket.spots)
+        fee = ticket.calculate_fee()
+        if self.ledger:
+            self.ledger.record_exit(ticket, fee)
+        return fee
+
+# ---------------- SIMULATION ----------------
+
+# Distribution helpers: each returns a function rng -> sample (seconds).
+# The function may also carry .many(np_rng, n), drawing n samples as a
+# NumPy array; the simulator then samples in blocks instead of one by one.
+def _distribution(sample, many):
+    sample.many = many
+    return sample
+
+def exponential(mean):
+    return _distribution(lambda rng: rng.expovariate(1.0 / mean),
+                         lambda np_rng, n: np_rng.exponential(mean, n))
+
+def uniform(low, high):
+    return _distribution(lambda rng: rng.uniform(low, high),
+                         lambda np_rng, n: np_rng.uniform(low, high, n))
+
+def lognormal(mean, sigma=0.5):
+    mu = math.log(mean) - sigma * sigma / 2
+    return _distribution(lambda rng: rng.lognormvariate(mu, sigma),
+                         lambda np_rng, n: np_rng.lognormal(mu, sigma, n))
+
+class ParkingSimulator:
+    """Discrete-event simulation of a ParkingLot in simulated time.
+
+    Each VehicleType's arrivals are a stream of times built from blocks of
+    interarrival samples; the streams are merged in time order, and only
+    departures go through the event heap of (time, seq, ticket). The lot
+    and its tickets read the simulator clock during run(), so fees are
+    computed from simulated dwell times and nothing sleeps. The lot's own
+    clock, verbosity and ticket ids are restored afterwards.
+    """
+
+    BLOCK = 4096   # samples drawn per distribution call
+
+    def __init__(self, lot, interarrival, dwell, seed=None):
+        # interarrival / dwell: VehicleType -> distribution function
+        self.lot = lot
+        self.interarrival = interarrival
+        self.dwell = dwell
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed) if np is not None else None
+        self.now = 0.0
+        self.events = []   # pending departures
+        self.seq = 0
+        self.capacity = sum(len(floor.spots) for floor in lot.floors)
+
+    def _blocks(self, sample):
+        many = getattr(sample, "many", None)
+        rng, np_rng, size = self.rng, self.np_rng, self.BLOCK
+        while True:
+            if many is not None and np_rng is not None:
+                yield many(np_rng, size).tolist()
+            else:
+                yield [sample(rng) for _ in range(size)]
+
+    def _arrivals(self, value, sample):
+        # (time, VehicleType value) for every arrival of one type, in order
+        at = self.now
+        for gaps in self._blocks(sample):
+            times = list(itertools.accumulate(gaps, initial=at))
+            at = times[-1]
+            yield from zip(times[1:], itertools.repeat(value))
+
+    def run(self, duration=None, max_arrivals=None):
+        # Simulated tickets never leave the process, so sequential ids are
+        # enough; hex digits keep them valid UUIDs for a TicketLedger
+        counter = itertools.count(1)
+        saved = self.lot.clock, self.lot.verbose, self.lot.ticket_ids
+        self.lot.clock = lambda: self.now
+        self.lot.verbose = False
+        self.lot.ticket_ids = lambda: "%032x" % next(counter)
+        try:
+            return self._run(duration, max_arrivals)
+        finally:
+            self.lot.clock, self.lot.verbose, self.lot.ticket_ids = saved
+
+    def _run(self, duration, max_arrivals):
+        # Hot loop state is keyed by VehicleType value and bound to locals.
+        # Simulated vehicles need no identity, so one Vehicle per type is reused.
+        types = {t.value: t for t in VehicleType}
+        vehicles = {t.value: Vehicle(f"SIM-{t.name}", t) for t in self.interarrival}
+        dwell = {t.value: itertools.chain.from_iterable(self._blocks(sample)).__next__
+                 for t, sample in self.dwell.items()}
+        stream = heapq.merge(*(self._arrivals(t.value, sample) for t, sample in self.interarrival.items()))
+
+        arrivals = dict.fromkeys(types, 0)
+        rejected = dict.fromkeys(types, 0)
+        revenue = 0
+        occupied = self.capacity - sum(floor.free_count for floor in self.lot.floors)
+        peak_occupied = occupied
+        occupied_seconds = 0.0
+        start = last_change = self.now
+        end = float("inf") if duration is None else start + duration
+        limit = float("inf") if max_arrivals is None else max_arrivals
+        total_arrivals = 0
+
+        park_vehicle = self.lot.park_vehicle
+        exit_vehicle = self.lot.exit_vehicle
+        heappop, heappush = heapq.heappop, heapq.heappush
+        seq = self.seq
+        events = self.events
+        for at, value in stream:
+            if at > end:
+                break
+            # Departures due before this arrival
+            while events and events[0][0] <= at:
+                left_at, _, ticket = heappop(events)
+                occupied_seconds += occupied * (left_at - last_change)
+                last_change = self.now = left_at
+                revenue += exit_vehicle(ticket.ticket_id)
+                occupied -= len(ticket.spots)
+            occupied_seconds += occupied * (at - last_change)
+            last_change = self.now = at
+
+            total_arrivals += 1
+            arrivals[value] += 1
+            ticket = park_vehicle(vehicles[value])
+            if ticket:
+                occupied += len(ticket.spots)
+                if occupied > peak_occupied:
+                    peak_occupied = occupied
+                seq += 1
+                heappush(events, (at + dwell[value](), seq, ticket))
+            else:
+                rejected[value] += 1
+            if total_arrivals >= limit:
+                break
+
+        # Occupancy is averaged over the arrival window only; the remaining
+        # departures (up to the end of the run) still collect their fees
+        arrivals_end = self.now
+        while events and events[0][0] <= end:
+            left_at, _, ticket = heappop(events)
+            self.now = left_at
+            revenue += exit_vehicle(ticket.ticket_id)
+        self.seq = seq
+
+        elapsed = (self.now - start) or 1.0
+        arrival_window = (arrivals_end - start) or 1.0
+        return {
+            "simulated_hours": round(elapsed / 3600, 2),
+            "arrivals": total_arrivals,
+            "rejection_rate": {t.name: round(rejected[v] / arrivals[v], 4) if arrivals[v] else 0.0
+                               for v, t in types.items()},
+            "avg_occupancy": round(occupied_seconds / arrival_window / self.capacity, 4),
+            "peak_occupancy": round(peak_occupied / self.capacity, 4),
+            "revenue": revenue,
+        }
 
 # ---------------- DISPLAY BOARD ----------------
 
@@ -114,12 +684,143 @@ class DisplayBoard:
     def show(self, floors):
         print("\n--- Parking Status ---")
         for floor in floors:
-            free = sum(1 for s in floor.spots if s.status == SpotStatus.FREE)
-            print(f"Floor {floor.floor_id}: Free Spots = {free}")
+            print(f"Floor {floor.floor_id}: Free Spots = {floor.free_count}")
+
+# ---------------- BENCHMARK ----------------
+
+def benchmark_allocation(total_spots=100_000, floors=10, operations=200_000):
+    sizes = (SpotSize.SMALL, SpotSize.MEDIUM, SpotSize.LARGE)
+    per_floor = total_spots // floors
+    lot = ParkingLot([
+        ParkingFloor(f, [ParkingSpot(i, sizes[i * 3 // per_floor]) for i in range(per_floor)])
+        for f in range(floors)
+    ])
+    vehicle_types = (VehicleType.MOTORCYCLE, VehicleType.CAR, VehicleType.CAR)
+
+    # Fill the lot to ~95% so arrivals have to search past occupied spots
+    tickets = []
+    for i in range(int(total_spots * 0.95)):
+        ticket = lot.park_vehicle(Vehicle(f"V{i}", vehicle_types[i % 3]))
+        if ticket:
+            tickets.append(ticket.ticket_id)
+
+    # Rush-hour churn: one exit and one arrival per operation
+    start = time.perf_counter()
+    for i in range(operations // 2):
+        lot.exit_vehicle(tickets[i])
+        ticket = lot.park_vehicle(Vehicle(f"R{i}", vehicle_types[i % 3]))
+        if ticket:
+            tickets.append(ticket.ticket_id)
+    elapsed = time.perf_counter() - start
+
+    # Buses on a mostly full lot: find_first over the free-run tree
+    bus_ops = 0
+    start = time.perf_counter()
+    for i in range(operations // 20):
+        lot.exit_vehicle(tickets[operations // 2 + i])
+        ticket = lot.park_vehicle(Vehicle(f"B{i}", VehicleType.BUS))
+        if ticket:
+            lot.exit_vehicle(ticket.ticket_id)
+            bus_ops += 2
+    bus_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        sum(floor.free_count for floor in lot.floors)
+    display_us = (time.perf_counter() - start) * 1000
+
+    print(f"{total_spots} spots: {operations / elapsed:,.0f} park/exit ops/s, "
+          f"{(operations // 20 + bus_ops) / bus_elapsed:,.0f} bus ops/s, "
+          f"display {display_us:.1f} us/refresh")
+
+
+def simulate_gates(gates=8, transactions_per_gate=20_000, floors=4, spots_per_floor=600, thread_safe=True):
+    """Entry/exit gates hammering one thread-safe lot from separate threads.
+
+    Every allocated spot is claimed in a shared owner map; a spot that is
+    already owned when a new ticket claims it is a double allocation.
+    """
+    sizes = (SpotSize.SMALL, SpotSize.MEDIUM, SpotSize.LARGE)
+    lot = ParkingLot([
+        ParkingFloor(f, [ParkingSpot(i, sizes[i * 3 // spots_per_floor]) for i in range(spots_per_floor)])
+        for f in range(floors)
+    ], thread_safe=thread_safe)
+    vehicle_types = (VehicleType.MOTORCYCLE, VehicleType.CAR, VehicleType.CAR, VehicleType.BUS)
+    owners = {}
+    double_allocations = []
+    rejected = [0] * gates
+
+    def gate(gate_id):
+        parked = []
+        for i in range(transactions_per_gate):
+            if parked and (len(parked) > spots_per_floor // gates or i % 2):
+                ticket = parked.pop(0)
+                for spot in ticket.spots:
+                    owners.pop(id(spot), None)
+                lot.exit_vehicle(ticket.ticket_id)
+                continue
+            ticket = lot.park_vehicle(Vehicle(f"G{gate_id}-{i}", vehicle_types[i % 4]))
+            if not ticket:
+                rejected[gate_id] += 1
+                continue
+            for spot in ticket.spots:
+                if owners.setdefault(id(spot), ticket.ticket_id) != ticket.ticket_id:
+                    double_allocations.append(spot)
+            parked.append(ticket)
+
+    threads = [threading.Thread(target=gate, args=(g,)) for g in range(gates)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = gates * transactions_per_gate
+    print(f"{gates} gates: {total / elapsed:,.0f} transactions/s, "
+          f"{sum(rejected)} rejected, {len(double_allocations)} double allocations")
+    return len(double_allocations)
+
+
+def benchmark_simulation(arrivals=1_000_000, spots_per_floor=2000, floors=5):
+    sizes = (SpotSize.SMALL, SpotSize.MEDIUM, SpotSize.LARGE)
+    lot = ParkingLot([
+        ParkingFloor(f, [ParkingSpot(i, sizes[i * 3 // spots_per_floor]) for i in range(spots_per_floor)])
+        for f in range(floors)
+    ])
+    simulator = ParkingSimulator(
+        lot,
+        interarrival={
+            VehicleType.MOTORCYCLE: exponential(2.0),
+            VehicleType.CAR: exponential(1.0),
+            VehicleType.BUS: exponential(60.0),
+        },
+        dwell={
+            VehicleType.MOTORCYCLE: lognormal(2 * 3600),
+            VehicleType.CAR: lognormal(3 * 3600),
+            VehicleType.BUS: uniform(1800, 4 * 3600),
+        },
+        seed=42,
+    )
+    start = time.perf_counter()
+    report = simulator.run(max_arrivals=arrivals)
+    elapsed = time.perf_counter() - start
+    print(f"{report['arrivals']:,} simulated arrivals in {elapsed:.1f}s "
+          f"({report['arrivals'] / elapsed:,.0f}/s): {report}")
+    return report
+
 
 # ---------------- MAIN ----------------
 
 if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        benchmark_allocation()
+        simulate_gates()
+        benchmark_simulation()
+        sys.exit()
+
     # Create floors
     floor1_spots = [ParkingSpot(i, SpotSize.MEDIUM) for i in range(5)]
     floor2_spots = [ParkingSpot(i, SpotSize.LARGE) for i in range(6)]
@@ -13,7 +13,23 @@
 
 
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from itertools import islice
+import asyncio
+import csv
+import hashlib
+import heapq
+import hmac
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
 
 
 
@@ -41,66 +57,347 @@ class UserRoles(Enum):
 
 
 
-class RoleValidation(ABC):
-    @abstractmethod
-    def validate_password(self, user: User) -> bool:
-        pass
+class Violation(Enum):
+    MinLength = "minimum length"
+    Uppercase = "uppercase letter"
+    Lowercase = "lowercase letter"
+    Number = "number"
+    Special = "special character"
+    Blocklisted = "password that is not common or breached"
 
 
-class AdminValidation(RoleValidation):
-    def validate_password(self, user: User) -> bool:
-        result = ConfigurableRules(user.get_password()).is_validpassword()
-        if result != "Password is valid":
-            print(result)
-            return False
 
-        for char in user.get_password():
-            if char in "!@#$%^&*()":
-                print("It is valid password for Admin role")
-                return True
+class PasswordPolicy:
+    SPECIAL_CHARS = "!@#$%^&*()"
+
+    # Character-class tags produced by the translation table
+    UPPER, LOWER, DIGIT, SPECIAL = "\x01", "\x02", "\x03", "\x04"
+
+    def __init__(self, min_length=8, min_upper=1, min_lower=1, min_digits=1, min_special=0,
+                 special_chars=SPECIAL_CHARS, blocklist=None):
+        self.min_length = min_length
+        self.blocklist = blocklist
+        self.requirements = (
+            (Violation.Uppercase, self.UPPER, min_upper),
+            (Violation.Lowercase, self.LOWER, min_lower),
+            (Violation.Number, self.DIGIT, min_digits),
+            (Violation.Special, self.SPECIAL, min_special),
+        )
+        self.requirements = tuple(r for r in self.requirements if r[2] > 0)
+        self.special_chars = special_chars
+
+        # Compiled once: ASCII characters are mapped to their class tag (or
+        # dropped), so one str.translate classifies the password in C and the
+        # checks just count tags. Non-ASCII characters pass through and are
+        # tagged by _tag_non_ascii.
+        table = {}
+        for code in range(128):
+            char = chr(code)
+            if char.isupper():
+                table[code] = self.UPPER
+            elif char.islower():
+                table[code] = self.LOWER
+            elif char.isdigit():
+                table[code] = self.DIGIT
+            else:
+                table[code] = None
+        for char in special_chars:
+            table[ord(char)] = self.SPECIAL
+        self.table = table
+
+    def check(self, password):
+        violations = []
+        if len(password) < self.min_length:
+            violations.append(Violation.MinLength)
+        tags = password.translate(self.table)
+        if not tags.isascii():
+            tags = self._tag_non_ascii(tags)
+        for violation, tag, minimum in self.requirements:
+            if tags.count(tag) < minimum:
+                violations.append(violation)
+        if self.blocklist is not None and self.blocklist.contains(password):
+            violations.append(Violation.Blocklisted)
+        return violations
+
+    def _tag_non_ascii(self, tags):
+        out = []
+        for char in tags:
+            if char <= "\x7f":
+                out.append(char)
+            elif char.isupper():
+                out.append(self.UPPER)
+            elif char.islower():
+                out.append(self.LOWER)
+            elif char.isdigit():
+                out.append(self.DIGIT)
+        return "".join(out)
+
+    def describe(self, violation: Violation):
+        if violation == Violation.MinLength:
+            return f"{violation.value} {self.min_length}"
+        if violation == Violation.Blocklisted:
+            return violation.value
+        minimum = next(m for v, _, m in self.requirements if v == violation)
+        return violation.value if minimum == 1 else f"{minimum} {violation.value}s"
+
+
+
+def password_hash(password):
+    digest = hashlib.blake2b(password.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+
+class BloomFilter:
+    """Bloom filter over password hashes, stored as a header plus a bit array.
+
+    Built offline with build() and save(); load() maps the file read-only,
+    so startup does not read it and the OS pages bits in on demand. A lookup
+    derives k bit positions from one 128-bit hash (double hashing).
+    """
+
+    MAGIC = b"BLM1"
+    HEADER = struct.Struct("<4sIQ")   # magic, hash count, bit count
+
+    def __init__(self, bits, hash_count, data):
+        self.bits = bits
+        self.hash_count = hash_count
+        self.data = data
+
+    @classmethod
+    def build(cls, passwords, expected_items, false_positive_rate=0.01):
+        expected_items = max(1, expected_items)
+        bits = max(8, int(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(bits / expected_items * math.log(2)))
+        bloom = cls(bits, hash_count, bytearray((bits + 7) // 8))
+        for password in passwords:
+            bloom.add(password)
+        return bloom
+
+    def _positions(self, password):
+        h1, h2 = password_hash(password)
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hash_count)]
+
+    def add(self, password):
+        data = self.data
+        for pos in self._positions(password):
+            data[pos >> 3] |= 1 << (pos & 7)
+
+    def contains(self, password):
+        # Positions are generated lazily: most misses stop after one or two
+        h1, h2 = password_hash(password)
+        data, bits = self.data, self.bits
+        for _ in range(self.hash_count):
+            pos = h1 % bits
+            if not data[pos >> 3] & (1 << (pos & 7)):
+                return False
+            h1 += h2
+        return True
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.hash_count, self.bits))
+            f.write(self.data)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, hash_count, bits = cls.HEADER.unpack_from(mapped, 0)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a password bloom filter file")
+        return cls(bits, hash_count, memoryview(mapped)[cls.HEADER.size:])
+
+
+
+class ExactHashSet:
+    """Sorted file of 64-bit password hashes for confirming Bloom positives.
+
+    build() is an external sort: hashes are collected into fixed-size
+    arrays, each sorted and written as a run, and the runs are merged with
+    duplicates dropped, so memory stays at about one run whatever the list
+    size.
+    """
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+
+    @staticmethod
+    def build(passwords, path, run_items=1_000_000):
+        runs = []
+        try:
+            run = array("Q")
+            for password in passwords:
+                run.append(password_hash(password)[0])
+                if len(run) >= run_items:
+                    runs.append(ExactHashSet._write_run(run, path, len(runs)))
+                    run = array("Q")
+            if run or not runs:
+                runs.append(ExactHashSet._write_run(run, path, len(runs)))
+
+            with open(path, "wb") as f:
+                out = array("Q")
+                last = None
+                for h in heapq.merge(*(ExactHashSet._read_run(r) for r in runs)):
+                    if h != last:
+                        out.append(h)
+                        last = h
+                        if len(out) >= 65536:
+                            out.tofile(f)
+                            del out[:]
+                out.tofile(f)
+        finally:
+            for run_path in runs:
+                os.remove(run_path)
 
-        print("Include at least one special character")
+    @staticmethod
+    def _write_run(run, path, index):
+        run = array("Q", sorted(run))
+        run_path = f"{path}.run{index}"
+        with open(run_path, "wb") as f:
+            run.tofile(f)
+        return run_path
+
+    @staticmethod
+    def _read_run(run_path, block=65536):
+        with open(run_path, "rb") as f:
+            while True:
+                items = array("Q")
+                try:
+                    items.fromfile(f, block)
+                except EOFError:   # short final block; items holds what was read
+                    pass
+                yield from items
+                if len(items) < block:
+                    return
+
+    @classmethod
+    def load(cls, path):
+        if os.path.getsize(path) == 0:   # built from an empty list; mmap rejects empty files
+            return cls(array("Q"))
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(memoryview(mapped).cast("Q"))
+
+    def contains(self, password):
+        h = password_hash(password)[0]
+        i = bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
+
+
+
+class PasswordBlocklist:
+    def __init__(self, bloom: BloomFilter, exact: ExactHashSet = None):
+        self.bloom = bloom
+        self.exact = exact
+
+    @classmethod
+    def load(cls, bloom_path, exact_path=None):
+        return cls(BloomFilter.load(bloom_path), ExactHashSet.load(exact_path) if exact_path else None)
+
+    def contains(self, password):
+        # Lists are mostly lowercase, so "Password1" is caught via "password1"
+        lowered = password.lower()
+        candidates = (password,) if lowered == password else (password, lowered)
+        for candidate in candidates:
+            if self.bloom.contains(candidate) and (self.exact is None or self.exact.contains(candidate)):
+                return True
         return False
 
 
-class RegularValidation(RoleValidation):
+def _read_password_list(list_path):
+    # One password per line, LF or CRLF; blank lines are not passwords
+    with open(list_path, encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            password = line.rstrip("\r\n")
+            if password:
+                yield password
+
+
+def build_blocklist(list_path, bloom_path, exact_path=None, false_positive_rate=0.001):
+    """Offline: build the filter files from a newline-separated password list."""
+    count = sum(1 for _ in _read_password_list(list_path))
+    bloom = BloomFilter.build(_read_password_list(list_path), count, false_positive_rate)
+    bloom.save(bloom_path)
+    if exact_path:
+        ExactHashSet.build(_read_password_list(list_path), exact_path)
+    return count
+
+
+def enable_blocklist(blocklist: PasswordBlocklist):
+    for policy in ROLE_POLICIES.values():
+        policy.blocklist = blocklist
+
+
+
+# Role rules as data: a new role needs only an enum member and an entry here
+ROLE_POLICIES = {
+    UserRoles.Regular: PasswordPolicy(),
+    UserRoles.Admin: PasswordPolicy(min_special=1),
+    UserRoles.SuperAdmin: PasswordPolicy(min_special=2),
+}
+
+
+
+class RoleValidation(ABC):
+    @abstractmethod
     def validate_password(self, user: User) -> bool:
-        result = ConfigurableRules(user.get_password()).is_validpassword()
-        print(result)
-        return result == "Password is valid"
+        pass
+
 
+class PolicyValidation(RoleValidation):
+    role = None
+
+    def __init__(self, role: UserRoles = None, policy: PasswordPolicy = None):
+        self.role = role or self.role
+        self.policy = policy or ROLE_POLICIES[self.role]
+
+    def check(self, password):
+        return self.policy.check(password)
 
-class SuperAdminValidation(RoleValidation):
     def validate_password(self, user: User) -> bool:
-        result = ConfigurableRules(user.get_password()).is_validpassword()
-        if result != "Password is valid":
-            print(result)
+        violations = self.check(user.get_password())
+        if violations:
+            print("Password is missing: " + ", ".join(self.policy.describe(v) for v in violations))
             return False
+        print(f"Password valid for {self.role.value}")
+        return True
 
-        special_count = 0
-        for char in user.get_password():
-            if char in "!@#$%^&*()":
-                special_count += 1
 
-        if special_count >= 2:
-            print("Password valid for SuperAdmin")
-            return True
+class AdminValidation(PolicyValidation):
+    role = UserRoles.Admin
 
-        print("Include at least 2 special characters")
-        return False
+
+class RegularValidation(PolicyValidation):
+    role = UserRoles.Regular
+
+
+class SuperAdminValidation(PolicyValidation):
+    role = UserRoles.SuperAdmin
 
 
 class ValidationFactory:
+    validators = {
+        UserRoles.Regular.value: RegularValidation,
+        UserRoles.Admin.value: AdminValidation,
+        UserRoles.SuperAdmin.value: SuperAdminValidation,
+    }
+    _instances = {}
+
     @staticmethod
     def Validate_Role(user: User) -> RoleValidation:
-        if user.user_role == UserRoles.Regular.value:
-            return RegularValidation()
-        elif user.user_role == UserRoles.Admin.value:
-            return AdminValidation()
-        elif user.user_role == UserRoles.SuperAdmin.value:
-            return SuperAdminValidation()
-        else:
-            raise ValueError("Unknown user role")
+        validator = ValidationFactory._instances.get(user.user_role)
+        if validator is None:
+            if user.user_role in ValidationFactory.validators:
+                validator = ValidationFactory.validators[user.user_role]()
+            elif user.user_role in {role.value for role in ROLE_POLICIES}:
+                # Roles declared only as data get the generic validator
+                validator = PolicyValidation(UserRoles(user.user_role))
+            else:
+                raise ValueError("Unknown user role")
+            ValidationFactory._instances[user.user_role] = validator
+        return validator
 
 
 
@@ -109,38 +406,158 @@ class ConfigurableRules:
         self.password = password
 
     def is_validpassword(self):
-        missing = []
-
-        if len(self.password) < 8:
-            missing.append("minimum length 8")
-
-        has_upper = has_lower = has_num = False
-
-        for char in self.password:
-            if char.isupper():
-                has_upper = True
-            elif char.islower():
-                has_lower = True
-            elif char.isdigit():
-                has_num = True
-
-        if not has_upper:
-            missing.append("uppercase letter")
-        if not has_lower:
-            missing.append("lowercase letter")
-        if not has_num:
-            missing.append("number")
-
+        policy = ROLE_POLICIES[UserRoles.Regular]
+        missing = policy.check(self.password)
         if not missing:
             return "Password is valid"
-        return "Password is missing: " + ", ".join(missing)
+        return "Password is missing: " + ", ".join(policy.describe(v) for v in missing)
+
+
+
+class KdfParams:
+    """Key-derivation settings, stored alongside each hash so they can change."""
+
+    def __init__(self, algorithm="scrypt", n=2 ** 14, r=8, p=1, iterations=600_000, dklen=32):
+        if algorithm not in ("scrypt", "pbkdf2"):
+            raise ValueError("Unknown KDF algorithm")
+        self.algorithm = algorithm
+        self.n, self.r, self.p = n, r, p
+        self.iterations = iterations
+        self.dklen = dklen
+
+    def derive(self, password, salt):
+        if self.algorithm == "scrypt":
+            return hashlib.scrypt(password.encode(), salt=salt, n=self.n, r=self.r, p=self.p,
+                                  maxmem=256 * self.n * self.r * self.p + (1 << 20), dklen=self.dklen)
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations, dklen=self.dklen)
+
+    def encode(self):
+        # dklen is appended only when it differs from the default, so
+        # existing 32-byte records keep their encoding
+        suffix = f"${self.dklen}" if self.dklen != 32 else ""
+        if self.algorithm == "scrypt":
+            return f"scrypt${self.n}${self.r}${self.p}{suffix}"
+        return f"pbkdf2${self.iterations}{suffix}"
+
+    @classmethod
+    def decode(cls, text, dklen=32):
+        # dklen: used when the encoding has none (e.g. the stored digest length)
+        parts = text.split("$")
+        if parts[0] == "scrypt":
+            dklen = int(parts[4]) if len(parts) > 4 else dklen
+            return cls("scrypt", n=int(parts[1]), r=int(parts[2]), p=int(parts[3]), dklen=dklen)
+        dklen = int(parts[2]) if len(parts) > 2 else dklen
+        return cls("pbkdf2", iterations=int(parts[1]), dklen=dklen)
+
+    def __repr__(self):
+        return self.encode()
+
+
+
+class CredentialStore:
+    """Process-wide store of salted password hashes.
+
+    Records are "<kdf params>$<salt hex>$<hash hex>", so raising the KDF
+    cost later leaves old hashes verifiable. Hashing runs in a thread pool
+    (hashlib releases the GIL), so async callers never block the event loop.
+    """
+
+    _default = None
+
+    def __init__(self, kdf: KdfParams = None, workers=4):
+        self.kdf = kdf or KdfParams()
+        self.records = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(workers)
+
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def has_user(self, name):
+        with self.lock:
+            return name in self.records
+
+    def set_password(self, name, password):
+        salt = os.urandom(16)
+        digest = self.kdf.derive(password, salt)
+        with self.lock:
+            self.records[name] = f"{self.kdf.encode()}${salt.hex()}${digest.hex()}"
+
+    def verify(self, name, password):
+        with self.lock:
+            record = self.records.get(name)
+        if record is None:
+            return False
+        params, salt, digest = record.rsplit("$", 2)
+        derived = KdfParams.decode(params, len(digest) // 2).derive(password, bytes.fromhex(salt))
+        return hmac.compare_digest(derived, bytes.fromhex(digest))
+
+    def needs_rehash(self, name):
+        with self.lock:
+            params = self.records[name].rsplit("$", 2)[0]
+        return params != self.kdf.encode()
+
+    async def verify_async(self, name, password):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.verify, name, password)
+
+
+
+def calibrate_kdf(target_ms=250.0, algorithm="scrypt", workers=4, min_logins_per_sec=None, samples=3):
+    """Pick the largest KDF cost that meets the latency and throughput targets.
+
+    Doubles the cost parameter (scrypt n or PBKDF2 iterations) from a
+    cheap start. A throughput target caps the latency at what the usable
+    cores can sustain. Reports latency and thread-pool throughput for the
+    chosen parameters.
+    """
+    if min_logins_per_sec:
+        cores = min(workers, os.cpu_count() or 1)
+        target_ms = min(target_ms, 1000.0 * cores / min_logins_per_sec)
+
+    def measure(kdf):
+        salt = os.urandom(16)
+        start = time.perf_counter()
+        for _ in range(samples):
+            kdf.derive("Calibrate#1", salt)
+        return (time.perf_counter() - start) / samples * 1000
+
+    if algorithm == "scrypt":
+        candidate = lambda cost: KdfParams("scrypt", n=cost)
+        cost = 2 ** 10
+    else:
+        candidate = lambda cost: KdfParams("pbkdf2", iterations=cost)
+        cost = 10_000
+
+    chosen, latency = candidate(cost), measure(candidate(cost))
+    while True:
+        next_latency = measure(candidate(cost * 2))
+        if next_latency > target_ms:
+            break
+        cost *= 2
+        chosen, latency = candidate(cost), next_latency
+
+    store = CredentialStore(chosen, workers)
+    store.set_password("calibration", "Calibrate#1")
+    logins = workers * samples
+    start = time.perf_counter()
+    list(store.executor.map(lambda _: store.verify("calibration", "Calibrate#1"), range(logins)))
+    throughput = logins / (time.perf_counter() - start)
+    store.executor.shutdown()
+
+    print(f"{chosen}: {latency:.0f} ms per hash (target {target_ms:.0f} ms), "
+          f"{throughput:.1f} logins/s with {workers} threads")
+    return chosen, latency, throughput
 
 
 
 class PasswordManger:
-    def __init__(self, user: User):
+    def __init__(self, user: User, store: CredentialStore = None):
         self.user = user
-        self.user_password = {}
+        self.store = store or CredentialStore.default()
 
     def set_password(self):
         validator = ValidationFactory.Validate_Role(self.user)
@@ -149,11 +566,11 @@ class PasswordManger:
             print("Password NOT set due to validation failure")
             return
 
-        if self.user.name in self.user_password:
+        if self.store.has_user(self.user.name):
             print("Password already taken")
             return
 
-        self.user_password[self.user.name] = self.user.get_password()
+        self.store.set_password(self.user.name, self.user.get_password())
         print("Password set successfully")
 
     def reset_password(self, password):
@@ -167,12 +584,140 @@ class PasswordManger:
             print("Password reset failed due to validation")
             return
 
-        self.user_password[self.user.name] = password
+        self.store.set_password(self.user.name, password)
         print("Password reset successfully")
 
+    def verify_password(self, password):
+        return self.store.verify(self.user.name, password)
+
+    @staticmethod
+    def audit_file(input_path, report_path, workers=None, chunk_size=5000, blocklist_paths=None):
+        return audit_users(input_path, report_path, workers, chunk_size, blocklist_paths)
+
+
+
+# -------------------- BULK AUDIT --------------------
+
+def _audit_worker_init(blocklist_paths):
+    if blocklist_paths:
+        enable_blocklist(PasswordBlocklist.load(*blocklist_paths))
+
+
+def _audit_chunk(rows):
+    """Validate (name, password, role) rows; return only the failures."""
+    failures = []
+    for name, password, role in rows:
+        try:
+            validator = ValidationFactory.Validate_Role(User(name, password, role))
+        except ValueError:
+            failures.append((name, role, ["UnknownRole"]))
+            continue
+        violations = validator.check(password)
+        if violations:
+            failures.append((name, role, [v.name for v in violations]))
+    return len(rows), failures
+
+
+def _read_chunks(input_path, chunk_size):
+    """Yield (rows, malformed line numbers) per chunk_size input rows.
+
+    Blank and short rows are not audited but are reported by line number;
+    they never end the stream early.
+    """
+    with open(input_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)   # header: name,password,role
+        chunk, malformed, rows = [], [], 0
+        first_line = reader.line_num + 1
+        for row in reader:
+            if len(row) >= 3:
+                chunk.append(tuple(row[:3]))
+            elif any(field.strip() for field in row):
+                malformed.append(first_line)   # where the row starts, even if it spans lines
+            first_line = reader.line_num + 1
+            rows += 1
+            if rows == chunk_size:
+                yield chunk, malformed
+                chunk, malformed, rows = [], [], 0
+        if rows:
+            yield chunk, malformed
+
+
+def audit_users(input_path, report_path, workers=None, chunk_size=5000, blocklist_paths=None):
+    """Re-validate every stored credential in a CSV against the role policies.
+
+    Chunks are streamed to a process pool with a bounded number in flight,
+    and results are written in input order as JSON lines, so memory use does
+    not depend on the input size.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    checked = failed = malformed_rows = 0
+    start = last_report = time.perf_counter()
+
+    with ProcessPoolExecutor(workers, initializer=_audit_worker_init, initargs=(blocklist_paths,)) as pool, \
+            open(report_path, "w", encoding="utf-8") as report:
+        in_flight = []
+        chunks = _read_chunks(input_path, chunk_size)
+        while True:
+            for chunk, malformed in islice(chunks, max_in_flight - len(in_flight)):
+                in_flight.append((pool.submit(_audit_chunk, chunk), malformed))
+            if not in_flight:
+                break
+
+            future, malformed = in_flight.pop(0)
+            count, failures = future.result()
+            checked += count
+            failed += len(failures)
+            malformed_rows += len(malformed)
+            for line in malformed:
+                report.write(json.dumps({"line": line, "violations": ["MalformedRow"]}) + "\n")
+            for name, role, violations in failures:
+                report.write(json.dumps({"name": name, "role": role, "violations": violations}) + "\n")
+
+            now = time.perf_counter()
+            if now - last_report >= 1.0:
+                print(f"Audited {checked:,} users ({checked / (now - start):,.0f}/s), {failed:,} failing")
+                last_report = now
+
+    elapsed = time.perf_counter() - start
+    print(f"Audit done: {checked:,} users in {elapsed:.1f}s ({checked / elapsed:,.0f}/s), "
+          f"{failed:,} failing, {malformed_rows:,} malformed rows -> {report_path}")
+    return checked, failed
+
 
 
 if __name__ == "__main__":
+    import sys
+
+    if "--build-blocklist" in sys.argv:
+        # --build-blocklist passwords.txt blocklist.bloom [blocklist.hashes]
+        args = sys.argv[sys.argv.index("--build-blocklist") + 1:]
+        print(f"Indexed {build_blocklist(*args[:3])} passwords")
+        sys.exit()
+
+    blocklist_paths = None
+    if "--blocklist" in sys.argv:
+        # --blocklist blocklist.bloom [blocklist.hashes]
+        args = sys.argv[sys.argv.index("--blocklist") + 1:]
+        blocklist_paths = [a for a in args[:2] if not a.startswith("--")]
+        enable_blocklist(PasswordBlocklist.load(*blocklist_paths))
+
+    if "--calibrate" in sys.argv:
+        # --calibrate [target ms] [min logins/s]
+        args = [a for a in sys.argv[sys.argv.index("--calibrate") + 1:][:2] if not a.startswith("--")]
+        target = float(args[0]) if args else 250.0
+        min_rate = float(args[1]) if len(args) > 1 else None
+        calibrate_kdf(target, "scrypt", min_logins_per_sec=min_rate)
+        calibrate_kdf(target, "pbkdf2", min_logins_per_sec=min_rate)
+        sys.exit()
+
+    if "--audit" in sys.argv:
+        # --audit users.csv report.jsonl
+        input_path, report_path = sys.argv[sys.argv.index("--audit") + 1:][:2]
+        PasswordManger.audit_file(input_path, report_path, blocklist_paths=blocklist_paths)
+        sys.exit()
+
     user = User("Varun", "Aaabbaa1", UserRoles.Admin.value)
 
     manager = PasswordManger(user)
@@ -1,7 +1,14 @@
 import random
+import sys
+import time
 from collections import deque
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:  # headless batch mode falls back to stepping games one by one
+    np = None
+
 
 class Cell:
     def __init__(self, row, col):
@@ -48,8 +55,40 @@ class Snake:
         return True
 
 
+class FreeCells:
+    """Unoccupied cells (flat indices) with O(1) add, remove and uniform sample.
+
+    Removal swaps the last entry into the hole; pos[] tracks where each cell
+    sits so the swap needs no search.
+    """
+
+    def __init__(self, size):
+        self.cells = list(range(size))
+        self.pos = list(range(size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def add(self, cell):
+        self.pos[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def remove(self, cell):
+        hole = self.pos[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[hole] = last
+            self.pos[last] = hole
+
+    def sample(self, rng=random):
+        return self.cells[rng.randrange(len(self.cells))]
+
+
 class Food:
-    def __init__(self, rows, cols, occupied):
+    def __init__(self, rows, cols, occupied, free_cells=None):
+        if free_cells is not None:
+            self.position = Cell(*divmod(free_cells.sample(), cols))
+            return
         while True:
             r = random.randint(0, rows - 1)
             c = random.randint(0, cols - 1)
@@ -145,5 +184,273 @@ class SnakeGame:
                 food = Food(SnakeGame.ROWS, SnakeGame.COLS, snake.body_set)
 
 
+# ================= HEADLESS SIMULATION =================
+# Cells are flat indices (row * cols + col). Actions index ACTIONS, so the
+# opposite of action a is a ^ 1.
+ACTIONS = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+DELTAS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+EMPTY, BODY, HEAD, FOOD = 0, 1, 2, 3
+SYMBOLS = ".SHF"
+
+
+class SnakeEnv:
+    """One game without input()/print(): step(action) -> (reward, done)."""
+
+    def __init__(self, rows=SnakeGame.ROWS, cols=SnakeGame.COLS, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        size = self.rows * self.cols
+        self.grid = np.zeros(size, dtype=np.int8) if np is not None else bytearray(size)
+        self.free = FreeCells(size)
+        start = (self.rows // 2) * self.cols + self.cols // 2
+        self.body = deque([start])
+        self.free.remove(start)
+        self.grid[start] = HEAD
+        self.direction = ACTIONS.index(Direction.RIGHT)
+        self.score = 0
+        self.done = False
+        self._spawn_food()
+        return self.grid
+
+    def _spawn_food(self):
+        self.food = self.free.sample(self.rng)
+        self.free.remove(self.food)
+        self.grid[self.food] = FOOD
+
+    def step(self, action):
+        if self.done:
+            raise Exception("Game over, call reset()")
+        if isinstance(action, Direction):
+            action = ACTIONS.index(action)
+        if action != self.direction ^ 1:
+            self.direction = action
+
+        head = self.body[0]
+        row, col = divmod(head, self.cols)
+        dr, dc = DELTAS[self.direction]
+        row += dr
+        col += dc
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            self.done = True
+            return 0, True
+
+        nxt = row * self.cols + col
+        grow = nxt == self.food
+        tail = self.body[-1]
+        if self.grid[nxt] == BODY and not (nxt == tail and not grow):
+            self.done = True
+            return 0, True
+
+        grid = self.grid
+        grid[head] = BODY
+        if not grow:
+            self.body.pop()
+            grid[tail] = EMPTY
+            if nxt != tail:
+                self.free.add(tail)
+                self.free.remove(nxt)
+        grid[nxt] = HEAD
+        self.body.appendleft(nxt)
+
+        if not grow:
+            return 0, False
+        self.score += SnakeGame.SCORE_PER_FOOD
+        if not len(self.free):
+            self.done = True  # board filled
+        else:
+            self._spawn_food()
+        return SnakeGame.SCORE_PER_FOOD, self.done
+
+    def render(self):
+        print(f"\nScore: {self.score}")
+        for r in range(self.rows):
+            print(" ".join(SYMBOLS[self.grid[r * self.cols + c]] for c in range(self.cols)))
+
+
+class SnakeBatch:
+    """N independent games advanced in lockstep; finished games auto-reset.
+
+    With NumPy every step is a handful of vectorised ops over all games:
+    occupancy grids (n, cells), bodies as ring buffers of flat indices and one
+    swap-remove free list per game for O(1) food placement.
+    """
+
+    def __init__(self, n, rows=SnakeGame.ROWS, cols=SnakeGame.COLS, seed=None):
+        self.n = n
+        self.rows = rows
+        self.cols = cols
+        self.episodes = 0
+        self.finished_score = 0
+        if np is None:
+            self.games = [SnakeEnv(rows, cols, None if seed is None else seed + i) for i in range(n)]
+            return
+
+        cells = rows * cols
+        self.rng = np.random.default_rng(seed)
+        self.all = np.arange(n)
+        self.grid = np.zeros((n, cells), dtype=np.int8)
+        self.body = np.zeros((n, cells), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.food = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.free = np.zeros((n, cells), dtype=np.int32)
+        self.free_pos = np.zeros((n, cells), dtype=np.int32)
+        self.free_count = np.zeros(n, dtype=np.int64)
+        self.dr = np.array([d[0] for d in DELTAS])
+        self.dc = np.array([d[1] for d in DELTAS])
+        self._reset(self.all)
+
+    # ----- vectorised free lists (each game appears at most once per call) -----
+    def _free_add(self, games, cells):
+        slot = self.free_count[games]
+        self.free[games, slot] = cells
+        self.free_pos[games, cells] = slot
+        self.free_count[games] += 1
+
+    def _free_remove(self, games, cells):
+        hole = self.free_pos[games, cells]
+        last = self.free[games, self.free_count[games] - 1]
+        self.free[games, hole] = last
+        self.free_pos[games, last] = hole
+        self.free_count[games] -= 1
+
+    def _spawn_food(self, games):
+        pick = (self.rng.random(len(games)) * self.free_count[games]).astype(np.int64)
+        cells = self.free[games, pick]
+        self._free_remove(games, cells)
+        self.grid[games, cells] = FOOD
+        self.food[games] = cells
+
+    def _reset(self, games):
+        cells = self.rows * self.cols
+        start = (self.rows // 2) * self.cols + self.cols // 2
+        self.grid[games] = EMPTY
+        self.free[games] = np.arange(cells)
+        self.free_pos[games] = np.arange(cells)
+        self.free_count[games] = cells
+        self._free_remove(games, np.full(len(games), start))
+        self.body[games, 0] = start
+        self.grid[games, start] = HEAD
+        self.head_ptr[games] = 0
+        self.length[games] = 1
+        self.direction[games] = ACTIONS.index(Direction.RIGHT)
+        self.score[games] = 0
+        self._spawn_food(games)
+
+    def observe(self):
+        if np is None:
+            return [list(game.grid) for game in self.games]
+        return self.grid.reshape(self.n, self.rows, self.cols)
+
+    def step(self, actions):
+        """Advance every game one tick; returns (rewards, dones) per game."""
+        if np is None:
+            return self._step_fallback(actions)
+
+        cells = self.rows * self.cols
+        actions = np.asarray(actions, dtype=np.int64)
+        self.direction = np.where(actions == (self.direction ^ 1), self.direction, actions)
+
+        heads = self.body[self.all, self.head_ptr]
+        row = heads // self.cols + self.dr[self.direction]
+        col = heads % self.cols + self.dc[self.direction]
+        wall = (row < 0) | (row >= self.rows) | (col < 0) | (col >= self.cols)
+        nxt = np.where(wall, 0, row * self.cols + col)
+        tails = self.body[self.all, (self.head_ptr - self.length + 1) % cells]
+        grow = ~wall & (nxt == self.food)
+        into_tail = ~grow & (nxt == tails)
+        hit = ~wall & (self.grid[self.all, nxt] == BODY) & ~into_tail
+        dead = wall | hit
+
+        alive = np.flatnonzero(~dead)
+        moving = np.flatnonzero(~dead & ~grow)
+        shifting = np.flatnonzero(~dead & ~grow & ~into_tail)
+        self.grid[alive, heads[alive]] = BODY
+        self.grid[moving, tails[moving]] = EMPTY
+        self._free_add(shifting, tails[shifting])
+        self._free_remove(shifting, nxt[shifting])
+        self.grid[alive, nxt[alive]] = HEAD
+        self.head_ptr[alive] = (self.head_ptr[alive] + 1) % cells
+        self.body[alive, self.head_ptr[alive]] = nxt[alive]
+
+        rewards = np.where(grow & ~dead, SnakeGame.SCORE_PER_FOOD, 0)
+        eaters = np.flatnonzero(grow & ~dead)
+        self.length[eaters] += 1
+        self.score[eaters] += SnakeGame.SCORE_PER_FOOD
+        won = np.zeros(self.n, dtype=bool)
+        won[eaters] = self.free_count[eaters] == 0
+        respawn = eaters[~won[eaters]]
+        if len(respawn):
+            self._spawn_food(respawn)
+
+        dones = dead | won
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.episodes += len(finished)
+            self.finished_score += int(self.score[finished].sum())
+            self._reset(finished)
+        return rewards, dones
+
+    def _step_fallback(self, actions):
+        rewards, dones = [], []
+        for game, action in zip(self.games, actions):
+            reward, done = game.step(int(action))
+            if done:
+                self.episodes += 1
+                self.finished_score += game.score
+                game.reset()
+            rewards.append(reward)
+            dones.append(done)
+        return rewards, dones
+
+
+# ================= BENCHMARK =================
+def benchmark_headless(steps=200_000, batch=512, batch_steps=2_000, seed=49):
+    rng = random.Random(seed)
+    env = SnakeEnv(seed=seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        if env.step(rng.randrange(4))[1]:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    print(f"SnakeEnv: {steps / elapsed:,.0f} steps/s (single game)")
+
+    games = SnakeBatch(batch, seed=seed)
+    if np is not None:
+        policy = np.random.default_rng(seed)
+        actions = [policy.integers(0, 4, batch) for _ in range(batch_steps)]
+    else:
+        actions = [[rng.randrange(4) for _ in range(batch)] for _ in range(batch_steps)]
+    start = time.perf_counter()
+    for tick in actions:
+        games.step(tick)
+    elapsed = time.perf_counter() - start
+    print(f"SnakeBatch x{batch}: {batch * batch_steps / elapsed:,.0f} steps/s, "
+          f"{games.episodes:,} episodes, avg score {games.finished_score / max(games.episodes, 1):.1f}")
+
+    # Food placement on a nearly full 50x50 board: rejection sampling vs free list
+    rows = cols = 50
+    free = FreeCells(rows * cols)
+    occupied = set()
+    for idx in range(rows * cols - 5):
+        free.remove(idx)
+        occupied.add(Cell(*divmod(idx, cols)))
+    for label, make in (("rejection", lambda: Food(rows, cols, occupied)),
+                        ("free list", lambda: Food(rows, cols, occupied, free))):
+        start = time.perf_counter()
+        for _ in range(200):
+            make()
+        print(f"Food on 99.8% full board ({label}): {(time.perf_counter() - start) / 200 * 1e6:,.1f} us")
+
+
 if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark_headless()
+        sys.exit()
     SnakeGame.run()
@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
+from array import array
 from enum import Enum
+import random
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:   # FleetInventory falls back to pure Python batches
+    np = None
 
 
 # ================= ENUMS =================
@@ -21,23 +30,45 @@ class Inventory:
         self.stock = {}
 
     def add_product(self, product: Product, quantity: int):
+        # Each slot has its own lock; "reserved" units are promised to open
+        # sessions and cannot be sold to anyone else.
         self.stock[product.product_type] = {
             "product": product,
-            "quantity": quantity
+            "quantity": quantity,
+            "reserved": 0,
+            "lock": threading.Lock(),
         }
 
     def is_available(self, product_type):
-        return (
-            product_type in self.stock
-            and self.stock[product_type]["quantity"] > 0
-        )
+        slot = self.stock.get(product_type)
+        return slot is not None and slot["quantity"] - slot["reserved"] > 0
+
+    def reserve(self, product_type):
+        slot = self.stock.get(product_type)
+        if slot is None:
+            return False
+        with slot["lock"]:
+            if slot["quantity"] - slot["reserved"] <= 0:
+                return False
+            slot["reserved"] += 1
+            return True
+
+    def commit(self, product_type):
+        slot = self.stock[product_type]
+        with slot["lock"]:
+            slot["reserved"] -= 1
+            slot["quantity"] -= 1
+        return slot["product"]
+
+    def release(self, product_type):
+        slot = self.stock[product_type]
+        with slot["lock"]:
+            slot["reserved"] -= 1
 
     def dispense(self, product_type):
-        if not self.is_available(product_type):
+        if not self.reserve(product_type):
             raise Exception("Product out of stock")
-
-        self.stock[product_type]["quantity"] -= 1
-        return self.stock[product_type]["product"]
+        return self.commit(product_type)
 
 
 # ================= PAYMENT STRATEGY =================
@@ -70,51 +101,266 @@ class PaymentFactory:
             raise Exception("Invalid payment method")
 
 
+# ================= SESSION STATE MACHINE =================
+class SessionState(Enum):
+    RESERVED = "RESERVED"
+    PAID = "PAID"
+    DISPENSED = "DISPENSED"
+    CANCELLED = "CANCELLED"
+
+
+class VendingSession:
+    TRANSITIONS = {
+        SessionState.RESERVED: {SessionState.PAID, SessionState.CANCELLED},
+        SessionState.PAID: {SessionState.DISPENSED, SessionState.CANCELLED},
+        SessionState.DISPENSED: set(),
+        SessionState.CANCELLED: set(),
+    }
+
+    def __init__(self, product: Product):
+        self.product = product
+        self.amount_paid = 0
+        self.state = SessionState.RESERVED
+        self.lock = threading.Lock()
+
+    def transition(self, new_state: SessionState):
+        if new_state not in self.TRANSITIONS[self.state]:
+            raise Exception(f"Invalid transition {self.state.value} -> {new_state.value}")
+        self.state = new_state
+
+
 # ================= VENDING MACHINE =================
 class VendingMachine:
     def __init__(self):
         self.inventory = Inventory()
-        self.selected_product = None
-        self.amount_paid = 0
+        self.session = None   # the keypad's session for the legacy API below
 
+    # ----- legacy single-keypad API: thin wrappers over the session API -----
     def select_product(self, product_type: ProductType):
-        if not self.inventory.is_available(product_type):
-            raise Exception("Product not available")
+        # Re-selecting abandons the previous, undispensed selection
+        if self.session is not None:
+            self.cancel(self.session)
+            self.session = None
 
-        self.selected_product = self.inventory.stock[product_type]["product"]
-        self.amount_paid = 0
-        print(f"Selected {product_type.value} | Price: ₹{self.selected_product.price}")
+        self.session = self.begin_session(product_type)
+        print(f"Selected {product_type.value} | Price: ₹{self.session.product.price}")
 
     def make_payment(self, payment_method):
-        if not self.selected_product:
+        if self.session is None:
             raise Exception("Select product first")
 
-        payment = PaymentFactory.get_payment_method(payment_method)
-        self.amount_paid += payment.pay(self.selected_product.price)
+        self.pay(self.session, payment_method)
 
     def dispense(self):
-        if not self.selected_product:
+        if self.session is None:
             raise Exception("No product selected")
 
-        if self.amount_paid < self.selected_product.price:
+        if self.session.state != SessionState.PAID:
             raise Exception("Insufficient payment")
 
-        product = self.inventory.dispense(self.selected_product.product_type)
+        product, change = self.complete(self.session)
+        self.session = None
         print(f"Dispensed {product.product_type.value}")
 
-        change = self.amount_paid - product.price
         if change > 0:
             print(f"Returned change: ₹{change}")
 
-        self._reset()
+    # ----- concurrent sessions (app, keypad, ...) -----
+    def begin_session(self, product_type: ProductType) -> VendingSession:
+        """Reserve one unit of product_type for a new, independent session."""
+        if not self.inventory.reserve(product_type):
+            raise Exception("Product not available")
+        return VendingSession(self.inventory.stock[product_type]["product"])
+
+    def pay(self, session: VendingSession, payment):
+        if isinstance(payment, str):
+            payment = PaymentFactory.get_payment_method(payment)
+        with session.lock:
+            if session.state != SessionState.RESERVED:
+                raise Exception("Session is not awaiting payment")
+            session.amount_paid += payment.pay(session.product.price - session.amount_paid)
+            if session.amount_paid >= session.product.price:
+                session.transition(SessionState.PAID)
+
+    def complete(self, session: VendingSession):
+        """Commit the reservation: stock is decremented only here."""
+        with session.lock:
+            session.transition(SessionState.DISPENSED)
+            product = self.inventory.commit(session.product.product_type)
+        return product, session.amount_paid - product.price
+
+    def cancel(self, session: VendingSession):
+        with session.lock:
+            session.transition(SessionState.CANCELLED)
+            self.inventory.release(session.product.product_type)
+        return session.amount_paid   # refund
+
+
+# ================= FLEET INVENTORY =================
+class FleetInventory:
+    """Stock for a whole fleet as one machine x product int32 array.
+
+    Cell (machine, product) lives at machine * len(products) + product.
+    Dispense telemetry is buffered and applied in batches. A low-stock
+    index (product -> machine ids at or below the threshold) is updated
+    only for the cells a batch touched, so "who is low on X" never scans
+    the fleet. Restocks and reads flush the buffer first, so they always
+    see every dispense reported before them.
+    """
+
+    def __init__(self, machines, products=None, low_stock_threshold=2, batch_size=10_000):
+        self.machines = machines
+        self.products = list(products or ProductType)
+        self.product_index = {p: i for i, p in enumerate(self.products)}
+        self.width = len(self.products)
+        self.threshold = low_stock_threshold
+        self.batch_size = batch_size
+        self.stock = array("i", bytes(4 * machines * self.width))
+        self.low_stock = [set(range(machines)) for _ in self.products]   # all empty at start
+        self.pending = []
+        self.events_applied = 0
+        self.rejected = 0   # dispenses reported for an already empty slot
+
+    def _cell(self, machine_id, product_type):
+        return machine_id * self.width + self.product_index[product_type]
+
+    def _reindex(self, cell):
+        machine_id, product = divmod(cell, self.width)
+        if self.stock[cell] <= self.threshold:
+            self.low_stock[product].add(machine_id)
+        else:
+            self.low_stock[product].discard(machine_id)
+
+    def restock(self, machine_id, product_type, quantity):
+        self.flush()
+        cell = self._cell(machine_id, product_type)
+        self.stock[cell] += quantity
+        self._reindex(cell)
+
+    def quantity(self, machine_id, product_type):
+        self.flush()
+        return self.stock[self._cell(machine_id, product_type)]
+
+    def record_dispense(self, machine_id, product_type, quantity=1):
+        self.pending.append((machine_id * self.width + self.product_index[product_type], quantity))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        stock = self.stock
+        if np is not None:
+            cells = np.fromiter((c for c, _ in batch), dtype=np.int64, count=len(batch))
+            quantities = np.fromiter((q for _, q in batch), dtype=np.int32, count=len(batch))
+            view = np.frombuffer(stock, dtype=np.int32)
+            np.subtract.at(view, cells, quantities)
+            touched = np.unique(cells)
+            negative = touched[view[touched] < 0]
+            self.rejected += int(-view[negative].sum())
+            view[negative] = 0
+            touched = touched.tolist()
+        else:
+            touched = set()
+            for cell, quantity in batch:
+                left = stock[cell] - quantity
+                if left < 0:
+                    self.rejected += -left
+                    left = 0
+                stock[cell] = left
+                touched.add(cell)
+        for cell in touched:
+            self._reindex(cell)
+        self.events_applied += len(batch)
+
+    def machines_low_on(self, product_type):
+        self.flush()
+        return frozenset(self.low_stock[self.product_index[product_type]])
+
+
+def simulate_fleet(machines=5_000, events=2_000_000, restock_to=30, seed=4):
+    rng = random.Random(seed)
+    fleet = FleetInventory(machines, low_stock_threshold=10)
+    for machine_id in range(machines):
+        for product_type in fleet.products:
+            fleet.restock(machine_id, product_type, restock_to)
+
+    products = fleet.products
+    start = time.perf_counter()
+    restocked = 0
+    for i in range(events):
+        fleet.record_dispense(rng.randrange(machines), products[rng.randrange(len(products))])
+        if i % 100_000 == 99_999:
+            # Restock run: visit only the machines the index reports as low
+            for product_type in products:
+                for machine_id in fleet.machines_low_on(product_type):
+                    fleet.restock(machine_id, product_type, restock_to - fleet.quantity(machine_id, product_type))
+                    restocked += 1
+    fleet.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{machines:,} machines: {events / elapsed:,.0f} dispense events/s, "
+          f"{restocked:,} restocks, {fleet.rejected:,} rejected, "
+          f"{len(fleet.machines_low_on(ProductType.COKE)):,} low on Coke now")
+
+
+class SilentPayment(PaymentStrategy):
+    def pay(self, amount):
+        return amount
 
-    def _reset(self):
-        self.selected_product = None
-        self.amount_paid = 0
+
+def stress_test_sessions(threads=8, purchases_per_thread=5_000, stock=10_000, cancel_rate=0.1, seed=6):
+    """Concurrent buyers race for a limited stock; nothing may be oversold."""
+    vm = VendingMachine()
+    vm.inventory.add_product(Product(ProductType.COKE, 25), stock)
+    vm.inventory.add_product(Product(ProductType.WATER, 15), stock // 2)
+    products = (ProductType.COKE, ProductType.WATER)
+    dispensed = [0] * threads
+    sold_out = [0] * threads
+    payment = SilentPayment()
+
+    def buyer(index):
+        rng = random.Random(seed + index)
+        for _ in range(purchases_per_thread):
+            try:
+                session = vm.begin_session(products[rng.randrange(2)])
+            except Exception:
+                sold_out[index] += 1
+                continue
+            vm.pay(session, payment)
+            if rng.random() < cancel_rate:
+                vm.cancel(session)
+            else:
+                vm.complete(session)
+                dispensed[index] += 1
+
+    workers = [threading.Thread(target=buyer, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    left = sum(slot["quantity"] for slot in vm.inventory.stock.values())
+    reserved = sum(slot["reserved"] for slot in vm.inventory.stock.values())
+    initial = stock + stock // 2
+    oversold = sum(dispensed) + left != initial or left < 0 or reserved != 0
+    print(f"{threads} threads: {threads * purchases_per_thread / elapsed:,.0f} transactions/s, "
+          f"{sum(dispensed):,} dispensed, {sum(sold_out):,} sold out, {left:,} left, "
+          f"{'OVERSOLD' if oversold else 'stock consistent'}")
+    return not oversold
 
 
 # ================= CLIENT =================
 if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        simulate_fleet()
+        stress_test_sessions()
+        sys.exit()
+
     vm = VendingMachine()
 
     vm.inventory.add_product(Product(ProductType.COKE, 25), 5)
@@ -123,3 +369,10 @@ if __name__ == "__main__":
     vm.select_product(ProductType.COKE)
     vm.make_payment("cash")
     vm.dispense()
+
+    # Two independent sessions (e.g. app and keypad) no longer share state
+    app = vm.begin_session(ProductType.WATER)
+    keypad = vm.begin_session(ProductType.COKE)
+    vm.pay(app, "card")
+    vm.pay(keypad, "cash")
+    print(f"App got {vm.complete(app)[0].product_type.value}, refund to keypad: ₹{vm.cancel(keypad)}")